@@ -0,0 +1,281 @@
+# Michael D. Salerno
+
+import multiprocessing
+import random
+import timeit
+
+from closestPair import closestPair, fastClosestPair
+from closestPairND import closestPairND
+from countInversions import countInversions
+from dynamicClosestPair import DynamicClosestPair
+from gridClosestPair import gridClosestPair
+from mergeSort import mergeSort, bottomUpMergeSort
+from parallelClosestPair import parallelClosestPair
+from parallelCountInversions import parallelCountInversions
+from parallelMergeSort import parallelMergeSort
+from vectorized import np
+
+def bestTime(f, data, repeat = 3):
+    '''
+    Times f on a fresh copy of data and returns the best of several runs.
+
+    Input:  A function taking a single list, f, the list to pass to it, data,
+    and the number of runs, repeat.
+    Output: The smallest wall-clock time observed, in seconds.
+    '''
+
+    best = float('inf')
+    for r in range(repeat):
+        arr = list(data)
+        start = timeit.default_timer()
+        f(arr)
+        best = min(best, timeit.default_timer() - start)
+
+    return best
+
+def benchmarkMergeSort(n = 10**5, repeat = 3, seed = 0):
+    '''
+    Compares the recursive mergeSort to bottomUpMergeSort on presorted,
+    reversed, nearly sorted and random input of length n and prints the
+    results as a table.  Both run their pure Python merges (vectorCutoff is
+    set past the length of the input); mergeSort's NumPy path is timed in a
+    column of its own when NumPy is available.
+
+    Output: A dictionary mapping each distribution name to a tuple
+    (recursive time, bottom-up time, NumPy time), with None for the NumPy
+    time without NumPy.
+    '''
+
+    rng = random.Random(seed)
+    randomData = [rng.randint(1, n) for i in range(n)]
+    nearlySorted = sorted(randomData)
+    for i in range(n // 100):     #perturb 1% of the positions
+        a, b = rng.randrange(n), rng.randrange(n)
+        nearlySorted[a], nearlySorted[b] = nearlySorted[b], nearlySorted[a]
+
+    datasets = [('presorted', sorted(randomData)),
+                ('reversed', sorted(randomData, reverse = True)),
+                ('nearly sorted', nearlySorted),
+                ('random', randomData)]
+
+    results = {}
+    print('%-15s %12s %12s %9s %12s' % ('input', 'recursive', 'bottom-up', 'speedup', 'numpy'))
+    for name, data in datasets:
+        recursive = bestTime(lambda arr: mergeSort(arr, vectorCutoff = len(arr)), data, repeat)
+        bottomUp = bestTime(bottomUpMergeSort, data, repeat)
+        vector = bestTime(mergeSort, data, repeat) if np is not None else None
+        results[name] = (recursive, bottomUp, vector)
+        print('%-15s %11.4fs %11.4fs %8.2fx %12s' % (name, recursive, bottomUp, recursive / bottomUp,
+                                                    '%.4fs' % vector if vector is not None else '-'))
+
+    return results
+
+def benchmarkSpeedup(serial, parallel, data, maxWorkers = None, check = False, repeat = 1):
+    '''
+    Measures the speedup of a parallel routine over its serial counterpart
+    and prints the results as a table.
+
+    Input:  The serial routine, serial, and the parallel one, parallel, which
+    takes the number of workers as a keyword argument, their input, data, the
+    largest number of worker processes to try, maxWorkers (defaults to the
+    number of cores), whether to check that every parallel result matches
+    the serial one, check, and the number of timed runs, repeat.
+    Output: A dictionary mapping each number of workers, 2, 3, ...,
+    maxWorkers, to its wall time; the serial time is stored under 1.
+    '''
+
+    if maxWorkers is None:
+        maxWorkers = multiprocessing.cpu_count()
+
+    if check:
+        expected = serial(list(data))
+
+    results = {1: bestTime(serial, data, repeat)}
+    print('%-8s %12s %9s' % ('workers', 'time', 'speedup'))
+    print('%-8d %11.4fs %8.2fx' % (1, results[1], 1.0))
+    for w in range(2, maxWorkers + 1):
+        if check:
+            assert parallel(list(data), workers = w) == expected
+        results[w] = bestTime(lambda arr: parallel(arr, workers = w), data, repeat)
+        print('%-8d %11.4fs %8.2fx' % (w, results[w], results[1] / results[w]))
+
+    return results
+
+def benchmarkParallelMergeSort(n = 10**6, maxWorkers = None, repeat = 1, seed = 0):
+    '''
+    Measures the speedup of parallelMergeSort over the serial mergeSort on n
+    random integers (see benchmarkSpeedup).
+    '''
+
+    rng = random.Random(seed)
+    data = [rng.randint(1, n) for i in range(n)]
+
+    return benchmarkSpeedup(mergeSort, parallelMergeSort, data, maxWorkers, repeat = repeat)
+
+def benchmarkParallelCountInversions(n = 10**6, maxWorkers = None, repeat = 1, seed = 0):
+    '''
+    Measures the speedup of parallelCountInversions over the serial
+    countInversions on n random integers, checking that every count matches
+    the serial one (see benchmarkSpeedup).
+    '''
+
+    rng = random.Random(seed)
+    data = [rng.randint(1, n) for i in range(n)]
+
+    return benchmarkSpeedup(lambda arr: countInversions(arr, engine = 'merge'), parallelCountInversions, data,
+                            maxWorkers, True, repeat)
+
+def benchmarkClosestPair(n = 10**5, repeat = 3, seed = 0):
+    '''
+    Compares closestPair with fastClosestPair on n random points in the unit
+    square, and on n points clustered in a few small discs, and prints the
+    results as a table.
+
+    Output: A dictionary mapping each point set to a tuple
+    (closestPair time, fastClosestPair time).
+    '''
+
+    rng = random.Random(seed)
+    centers = [(rng.random(), rng.random()) for i in range(10)]
+    pointSets = [('uniform', [(rng.random(), rng.random()) for i in range(n)]),
+                 ('clustered', [(c[0] + rng.gauss(0, 0.001), c[1] + rng.gauss(0, 0.001))
+                                for c in (rng.choice(centers) for i in range(n))])]
+
+    results = {}
+    print('%-12s %12s %12s %9s' % ('points', 'original', 'fast', 'speedup'))
+    for name, points in pointSets:
+        original = bestTime(closestPair, points, repeat)
+        fast = bestTime(fastClosestPair, points, repeat)
+        results[name] = (original, fast)
+        print('%-12s %11.4fs %11.4fs %8.2fx' % (name, original, fast, original / fast))
+
+    return results
+
+def benchmarkParallelClosestPair(n = 10**6, maxWorkers = None, repeat = 1, seed = 0):
+    '''
+    Measures the speedup of parallelClosestPair over the serial
+    fastClosestPair on n random points in the unit square, checking that
+    every pair matches the serial one (see benchmarkSpeedup).
+    '''
+
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for i in range(n)]
+
+    return benchmarkSpeedup(fastClosestPair, parallelClosestPair, points, maxWorkers, True, repeat)
+
+def benchmarkGridClosestPair(sizes = (10**4, 10**5, 10**6), repeat = 1, seed = 0):
+    '''
+    Compares the divide and conquer fastClosestPair with the randomized
+    gridClosestPair on random points in the unit square of each size in
+    sizes, checks that they return the same pair, and prints the results as
+    a table.
+
+    Output: A dictionary mapping each size to a tuple
+    (fastClosestPair time, gridClosestPair time).
+    '''
+
+    rng = random.Random(seed)
+
+    results = {}
+    print('%-10s %12s %12s %9s' % ('points', 'divide', 'grid', 'speedup'))
+    for n in sizes:
+        points = [(rng.random(), rng.random()) for i in range(n)]
+        assert gridClosestPair(points, seed = seed) == fastClosestPair(points)
+        divide = bestTime(fastClosestPair, points, repeat)
+        grid = bestTime(lambda arr: gridClosestPair(arr, seed = seed), points, repeat)
+        results[n] = (divide, grid)
+        print('%-10d %11.4fs %11.4fs %8.2fx' % (n, divide, grid, divide / grid))
+
+    return results
+
+def benchmarkClosestPairND(n = 10**5, dimensions = (1, 2, 3, 8), repeat = 1, seed = 0):
+    '''
+    Times closestPairND on n random points in the unit cube of each
+    dimension in dimensions, and on n copies of a single point plus one
+    other point, which must be found at distance 0 without comparing the
+    copies with each other; checks that the first two copies are returned,
+    and that int coordinates too large for 64-bit squared distances are
+    still compared exactly, and prints the results as a table.
+
+    Output: A dictionary mapping each dimension to a tuple
+    (random time, duplicates time).
+    '''
+
+    rng = random.Random(seed)
+    large = [(0, 0), (3*10**9, 0), (3*10**9 + 5, 7), (10**10, 10**10)]
+    assert closestPairND(large) == (large[1], large[2])
+
+    results = {}
+    print('%-10s %12s %12s' % ('dimension', 'random', 'duplicates'))
+    for d in dimensions:
+        points = [tuple(rng.random() for k in range(d)) for i in range(n)]
+        copies = [(0.5,) * d] * n + [(1.0,) * d]
+        assert closestPairND(copies) == (copies[0], copies[1])
+        uniform = bestTime(closestPairND, points, repeat)
+        duplicates = bestTime(closestPairND, copies, repeat)
+        results[d] = (uniform, duplicates)
+        print('%-10d %11.4fs %11.4fs' % (d, uniform, duplicates))
+
+    return results
+
+def benchmarkDynamicClosestPair(n = 10**5, updates = 10**3, repeat = 1, seed = 0):
+    '''
+    Measures the update throughput of DynamicClosestPair against recomputing
+    the closest pair from scratch with fastClosestPair after every update.
+
+    Starting from n random points in the unit square, a random sequence of
+    updates, half insertions of new random points and half deletions of
+    random present points, is applied, and the closest pair is read after
+    each one.  The recomputation rate is extrapolated from the time of a
+    single full fastClosestPair run.
+
+    Output: A dictionary with the time to build the structure ('build'), the
+    number of updates per second with DynamicClosestPair ('dynamic') and with
+    full recomputation ('recompute').
+    '''
+
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for i in range(n)]
+    operations = []
+    present = list(points)
+    for u in range(updates):
+        if u % 2:
+            k = rng.randrange(len(present))
+            present[k], present[-1] = present[-1], present[k]
+            operations.append(('delete', present.pop()))
+        else:
+            p = (rng.random(), rng.random())
+            present.append(p)
+            operations.append(('insert', p))
+
+    start = timeit.default_timer()
+    structure = DynamicClosestPair(points)
+    build = timeit.default_timer() - start
+
+    start = timeit.default_timer()
+    for operation, p in operations:
+        if operation == 'insert':
+            structure.insert(p)
+        else:
+            structure.delete(p)
+        structure.closest()
+    dynamic = updates / (timeit.default_timer() - start)
+
+    recompute = 1 / bestTime(fastClosestPair, points, repeat)
+
+    print('%-12s %14s' % ('method', 'updates/s'))
+    print('%-12s %14.1f' % ('dynamic', dynamic))
+    print('%-12s %14.1f' % ('recompute', recompute))
+    print('build time %.4fs; %.0fx the throughput of recomputing' % (build, dynamic / recompute))
+
+    return {'build': build, 'dynamic': dynamic, 'recompute': recompute}
+
+if __name__ == '__main__':
+    benchmarkMergeSort()
+    benchmarkParallelMergeSort()
+    benchmarkParallelCountInversions()
+    benchmarkClosestPair()
+    benchmarkParallelClosestPair()
+    benchmarkGridClosestPair()
+    benchmarkClosestPairND()
+    benchmarkDynamicClosestPair()
@@ -1,6 +1,12 @@
 # Michael D. Salerno
 
-def closestPair(points):
+from array import array
+from math import inf, sqrt
+from operator import itemgetter
+
+from heap import MaxHeap
+
+def closestPair(points, workers = 1):
     '''
     My implementation of an O(nlog(n)) algorithm for finding the pair of points
     that are closest to each other among a set of points.  Euclidean distance
@@ -100,9 +106,18 @@ def closestPair(points):
     This algorithm's asymptotic time complexity can be verified using the 
     Master Method.  Its recurrences can be expressed as T(n) = 2*T(n/2) + O(n);
     thus, the running time is O(nlog(n))
+
+    With workers > 1, a large set of points with int or float coordinates is
+    split into vertical slabs that a pool of worker processes solve with the
+    recursion of fastClosestPair, and the pairs across the slab boundaries
+    are then resolved in strips of width d around them (see
+    parallelClosestPair.py); the pair found is the one fastClosestPair
+    returns.
     '''
-    
-    from operator import itemgetter
+
+    if workers > 1:
+        from parallelClosestPair import parallelClosestPair    #imported here because parallelClosestPair imports this module
+        return parallelClosestPair(points, workers)
     
     px = sorted(points, key = itemgetter(0))  #initial sorting of points by x and y coordinates to be passed into the recursive subroutine
     py = sorted(points, key = itemgetter(1))
@@ -122,8 +137,8 @@ def closestPair(points):
         elif len(px) == 3:
             return min((px[0], px[1]), (px[0], px[2]),(px[1], px[2]), key = euclideanDist)
         
-        q = px[:len(px)/2]  #left half of points
-        r = px[len(px)/2:]  #right half of points
+        q = px[:len(px)//2]  #left half of points
+        r = px[len(px)//2:]  #right half of points
         
         #print q, r
         #print px
@@ -179,9 +194,386 @@ def euclideanDist(pair):
     Input:  A list containing two points
     Output: Their Euclidean distance
     '''
-    from math import sqrt
     
     if pair == None:
         return float('inf')
     
-    return sqrt((pair[0][0] - pair[1][0])**2 + (pair[0][1] - pair[1][1])**2)
\ No newline at end of file
+    return sqrt((pair[0][0] - pair[1][0])**2 + (pair[0][1] - pair[1][1])**2)
+
+def fastClosestPair(points):
+    '''
+    A high-throughput version of closestPair.
+
+    Input:  A list of at least two tuples representing the x and y
+    coordinates of a set of points in R^2.
+    Output: A tuple of two tuples, the pair of points p*, q* in P that
+    minimize d(p, q).  Of several pairs at the same distance, the one whose
+    positions (i, j), i < j, in the input come first is returned, with p*
+    the point at position i.
+
+    The algorithm is the one described in closestPair, restructured so that
+    the recursion allocates nothing per level:
+        - Coincident points are found first, in O(n) time with a dictionary
+          (see duplicatePair); the closest pair is then at distance 0.
+        - Otherwise the points are sorted by x once, into an array of their
+          input positions, and their coordinates are copied into two lists in
+          that order, so a half of P is simply a range [lo, hi) of positions.
+        - Instead of splitting py into qy and ry at every level, the
+          recursion builds the y order bottom up, as in Merge Sort: each call
+          returns its range sorted by y, and the two halves are merged by
+          index between two preallocated arrays, which alternate as source
+          and destination from one level to the next (see
+          closestIndexPair).
+        - All distances are compared squared; no square roots are taken.
+        - The strip is collected into a third preallocated array during the
+          same pass as the merge (see mergeStrip), and each of its points is compared with the
+          following ones only until their vertical distance alone exceeds d.
+    '''
+
+    if len(points) < 2:
+        raise ValueError('At least two points are needed')
+
+    pair = duplicatePair(points)
+    if pair is None:
+        order = sorted(range(len(points)), key = points.__getitem__)
+        xs = [points[i][0] for i in order]
+        ys = [points[i][1] for i in order]
+        dist, i, j = closestIndexPair(xs, ys, array('l', order))
+        pair = (i, j)
+
+    return (points[pair[0]], points[pair[1]])
+
+def duplicatePair(points):
+    '''
+    Finds two coincident points.
+
+    Input:  A list of hashable points.
+    Output: The positions (i, j), i < j, of the first pair of equal points in
+    the order of (i, j), or None if the points are distinct.
+    '''
+
+    first = {}
+    pair = None
+    for j, p in enumerate(points):
+        i = first.setdefault(p, j)
+        if i != j and (pair is None or i < pair[0]):     #for a given i, the first j found is the smallest
+            pair = (i, j)
+
+    return pair
+
+def closestIndexPair(xs, ys, ids):
+    '''
+    The divide and conquer search of fastClosestPair.
+
+    Input:  Two lists, xs and ys, of the coordinates of n >= 2 distinct
+    points sorted by x (and by y among equal x), and an array of labels for
+    the points, ids, used to break ties between pairs at the same distance.
+    Output: A tuple (dist, i, j) of the squared distance of the closest pair
+    and the labels of its points, i < j; the smallest such tuple over all
+    pairs.
+
+    A range of positions [lo, hi) is split at mid, and every point of the
+    left half has x <= xs[mid] <= the x of every point of the right half, so
+    both points of a split pair within distance d of each other lie within d
+    of the line x = xs[mid].  The scan of the strip compares squared
+    distances with <= rather than <, so that ties between pairs are all seen
+    and resolved by label; since the points are distinct, and points on the
+    same side are at least d apart, only a constant number of points follow
+    each point of the strip within a vertical distance of d.
+    '''
+
+    n = len(xs)
+    src = array('l', range(n))         #positions of the points; both buffers start out identical
+    dst = array('l', range(n))
+    strip = array('l', [0]) * n
+
+    def solve(src, dst, lo, hi):
+        '''
+        Finds the closest pair among the positions [lo, hi) and leaves them
+        sorted by y in dst[lo:hi], using src as scratch space.
+        '''
+
+        if hi - lo <= 3:
+            best = None
+            for a in range(lo, hi):
+                for b in range(a + 1, hi):
+                    dx = xs[a] - xs[b]
+                    dy = ys[a] - ys[b]
+                    i = ids[a]
+                    j = ids[b]
+                    candidate = (dx*dx + dy*dy, i, j) if i < j else (dx*dx + dy*dy, j, i)
+                    if best is None or candidate < best:
+                        best = candidate
+
+            sortSmallRange(ys, dst, lo, hi)
+            return best
+
+        mid = (lo + hi) // 2
+        best = min(solve(dst, src, lo, mid), solve(dst, src, mid, hi))    #swap roles; the sorted halves land in src
+
+        d2 = best[0]
+        size = mergeStrip(xs, ys, src, dst, lo, mid, hi, d2, strip)
+
+        for s in range(size - 1):
+            p = strip[s]
+            xp = xs[p]
+            yp = ys[p]
+            for t in range(s + 1, size):
+                q = strip[t]
+                dy = ys[q] - yp
+                if dy*dy > d2:                 #every later point of the strip is even further up
+                    break
+                dx = xs[q] - xp
+                dist = dx*dx + dy*dy
+                if dist <= d2:
+                    i = ids[p]
+                    j = ids[q]
+                    candidate = (dist, i, j) if i < j else (dist, j, i)
+                    if candidate < best:
+                        best = candidate
+                        d2 = dist
+
+        return best
+
+    return solve(src, dst, 0, n)
+
+def mergeStrip(xs, ys, src, dst, lo, mid, hi, width2, strip):
+    '''
+    The combine step shared by the divide and conquer searches.
+
+    Input:  The coordinate lists, xs and ys, of points sorted by x, two
+    arrays of positions, src and dst, where src[lo:mid] and src[mid:hi] are
+    sorted by y, a squared distance, width2, and an array, strip.
+    Output: The number of points, size, within distance sqrt(width2) of the
+    line x = xs[mid]; strip[:size] holds their positions in y order, and
+    dst[lo:hi] holds all the positions [lo, hi) merged in y order.
+
+    Both are produced in a single pass over the range, without allocating.
+    '''
+
+    midx = xs[mid]
+    size = 0
+    a = lo
+    b = mid
+    pa = src[a]
+    pb = src[b]
+    ya = ys[pa]
+    yb = ys[pb]
+    for k in range(lo, hi):
+        if ya <= yb:
+            p = pa
+            a += 1
+            if a < mid:
+                pa = src[a]
+                ya = ys[pa]
+            else:
+                ya = inf                       #the left half is used up
+        else:
+            p = pb
+            b += 1
+            if b < hi:
+                pb = src[b]
+                yb = ys[pb]
+            else:
+                yb = inf
+        dst[k] = p
+        dx = xs[p] - midx
+        if dx*dx <= width2:
+            strip[size] = p
+            size += 1
+
+    return size
+
+def sortSmallRange(ys, dst, lo, hi):
+    '''
+    Insertion sort of the positions dst[lo:hi] by y; the base case of the
+    bottom-up y order.
+    '''
+
+    for a in range(lo + 1, hi):
+        p = dst[a]
+        b = a - 1
+        while b >= lo and ys[dst[b]] > ys[p]:
+            dst[b+1] = dst[b]
+            b -= 1
+        dst[b+1] = p
+
+def kClosestPairs(points, k):
+    '''
+    Finds the k closest pairs among a set of points.
+
+    Input:  A list of tuples representing the x and y coordinates of a set of
+    points in R^2, points, and the number of pairs, k.
+    Output: A generator of the min(k, n(n-1)/2) closest pairs, as tuples
+    (p, q), in order of increasing distance; pairs at the same distance come
+    in order of their positions (i, j), i < j, in the input, with p the point
+    at position i.  For k = 1, this is the pair fastClosestPair returns.
+
+    The recursion is the one of fastClosestPair, with the single best pair
+    replaced by a MaxHeap (see heap.py) of the k best pairs found so far, and
+    d by the distance of the worst of them, d_k (infinite until k pairs have
+    been found).  Each pair is examined at the level where it is first a
+    split pair, with d_k as the strip width.  d_k only decreases, and is
+    always at least the final kth smallest distance, so the strip at every
+    level contains each split pair among the final k; the strip narrows as
+    better pairs are found.  Pairs within a half were examined by the
+    recursion, so only split pairs are scanned in the strip.
+
+    The heap holds at most k pairs, so memory is O(n + k); the pairs are
+    yielded once the search is complete.
+    '''
+
+    n = len(points)
+    if n < 2 or k < 1:
+        return
+
+    order = sorted(range(n), key = points.__getitem__)
+    xs = [points[i][0] for i in order]
+    ys = [points[i][1] for i in order]
+    best = MaxHeap()                           #(squared distance, i, j) of the best pairs so far
+
+    def offer(dist, i, j):
+        '''
+        Records the pair of input positions i and j at squared distance
+        dist if it is among the k best so far, and returns the new d_k^2.
+        '''
+
+        candidate = (dist, i, j) if i < j else (dist, j, i)
+        if best.size() < k:
+            best.insert(candidate)
+        elif candidate < best.elements[0]:
+            best.extract_max()
+            best.insert(candidate)
+
+        return best.elements[0][0] if best.size() == k else inf
+
+    src = array('l', range(n))
+    dst = array('l', range(n))
+    strip = array('l', [0]) * n
+
+    def solve(src, dst, lo, hi):
+        '''
+        Offers every pair among the positions [lo, hi) that may be among the
+        k closest and leaves the positions sorted by y in dst[lo:hi].
+        '''
+
+        if hi - lo <= 3:
+            for a in range(lo, hi):
+                for b in range(a + 1, hi):
+                    dx = xs[a] - xs[b]
+                    dy = ys[a] - ys[b]
+                    offer(dx*dx + dy*dy, order[a], order[b])
+            sortSmallRange(ys, dst, lo, hi)
+            return
+
+        mid = (lo + hi) // 2
+        solve(dst, src, lo, mid)
+        solve(dst, src, mid, hi)
+
+        width2 = best.elements[0][0] if best.size() == k else inf
+        size = mergeStrip(xs, ys, src, dst, lo, mid, hi, width2, strip)
+        for s in range(size - 1):
+            p = strip[s]
+            left = p < mid
+            xp = xs[p]
+            yp = ys[p]
+            for t in range(s + 1, size):
+                q = strip[t]
+                dy = ys[q] - yp
+                if dy*dy > width2:
+                    break
+                if (q < mid) == left:          #not a split pair
+                    continue
+                dx = xs[q] - xp
+                dist = dx*dx + dy*dy
+                if dist <= width2:
+                    width2 = offer(dist, order[p], order[q])
+
+    solve(src, dst, 0, n)
+
+    pairs = []
+    while not best.is_empty():
+        pairs.append(best.extract_max())
+    for dist, i, j in reversed(pairs):
+        yield (points[i], points[j])
+
+def pairsWithin(points, r):
+    '''
+    Finds every pair of points within distance r of each other.
+
+    Input:  A list of tuples representing the x and y coordinates of a set of
+    points in R^2, points, and a distance, r >= 0.
+    Output: A generator of all pairs (p, q) at distance <= r, with p before q
+    in the input, in no particular order.  r = 0 finds the coincident points.
+
+    The recursion is the one of fastClosestPair with a strip of fixed width
+    r: each pair within distance r is a split pair at exactly one level, and
+    both of its points lie within r of that level's dividing line, so the
+    pairs are yielded from the strips as they are found.  Nothing but the
+    O(n) arrays of the recursion is kept, however many pairs there are;
+    the time is O(nlog(n)) plus the time to scan the strips, which is
+    proportional to the number of pairs reported when r is no larger than
+    the typical distance between neighbouring points.
+    '''
+
+    n = len(points)
+    if n < 2:
+        return
+
+    order = sorted(range(n), key = points.__getitem__)
+    xs = [points[i][0] for i in order]
+    ys = [points[i][1] for i in order]
+    r2 = r * r
+
+    src = array('l', range(n))
+    dst = array('l', range(n))
+    strip = array('l', [0]) * n
+
+    def solve(src, dst, lo, hi):
+        '''
+        Yields the pairs within distance r among the positions [lo, hi) and
+        leaves the positions sorted by y in dst[lo:hi].
+        '''
+
+        if hi - lo <= 3:
+            for a in range(lo, hi):
+                for b in range(a + 1, hi):
+                    dx = xs[a] - xs[b]
+                    dy = ys[a] - ys[b]
+                    if dx*dx + dy*dy <= r2:
+                        yield ordered(order[a], order[b])
+            sortSmallRange(ys, dst, lo, hi)
+            return
+
+        mid = (lo + hi) // 2
+        for pair in solve(dst, src, lo, mid):
+            yield pair
+        for pair in solve(dst, src, mid, hi):
+            yield pair
+
+        size = mergeStrip(xs, ys, src, dst, lo, mid, hi, r2, strip)
+        for s in range(size - 1):
+            p = strip[s]
+            left = p < mid
+            xp = xs[p]
+            yp = ys[p]
+            for t in range(s + 1, size):
+                q = strip[t]
+                dy = ys[q] - yp
+                if dy*dy > r2:
+                    break
+                if (q < mid) == left:          #not a split pair
+                    continue
+                dx = xs[q] - xp
+                if dx*dx + dy*dy <= r2:
+                    yield ordered(order[p], order[q])
+
+    def ordered(i, j):
+        '''
+        The points at input positions i and j, in input order.
+        '''
+
+        return (points[i], points[j]) if i < j else (points[j], points[i])
+
+    for pair in solve(src, dst, 0, n):
+        yield pair
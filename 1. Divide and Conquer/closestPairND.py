@@ -0,0 +1,336 @@
+# Michael D. Salerno
+
+from math import sqrt
+
+from closestPair import duplicatePair
+from gridClosestPair import duplicateRows
+from vectorized import np
+
+BLOCK_PAIRS = 1 << 16        #strips whose halves form at most this many pairs are compared as a single block
+
+def euclidean(D):
+    '''
+    Squared Euclidean length of coordinate differences D along the first axis.
+    '''
+
+    return np.einsum('k...,k...->...', D, D)
+
+def manhattan(D):
+    '''
+    Manhattan (L1) length of coordinate differences D along the first axis.
+    '''
+
+    return np.abs(D).sum(axis = 0)
+
+def chebyshev(D):
+    '''
+    Chebyshev (L-infinity) length of coordinate differences D along the first
+    axis.
+    '''
+
+    return np.abs(D).max(axis = 0)
+
+METRICS = {'euclidean': (euclidean, lambda v: sqrt(v) * (1 + 1e-12)),     #(kernel, cutoff) pairs; see closestPairND; the square root is rounded up
+           'manhattan': (manhattan, lambda v: v),
+           'chebyshev': (chebyshev, lambda v: v)}
+
+PYTHON_METRICS = {'euclidean': lambda p, q: sum((a - b)*(a - b) for a, b in zip(p, q)),
+                  'manhattan': lambda p, q: sum(abs(a - b) for a, b in zip(p, q)),
+                  'chebyshev': lambda p, q: max(abs(a - b) for a, b in zip(p, q))}
+
+def closestPairND(points, metric = 'euclidean', treeDimension = 4, leafSize = 32):
+    '''
+    Closest pair of points in d dimensions, under a choice of metric.
+
+    Input:  A list of tuples of d coordinates each (or a NumPy array of
+    shape (n, d)), points, with n >= 2; the metric, metric; the dimension
+    above which a k-d tree is used instead of divide and conquer,
+    treeDimension; and the number of points below which subsets are compared
+    by brute force, leafSize.
+    Output: A tuple of two tuples, the pair of points p*, q* that minimize
+    the distance; of several pairs at the same distance, the one whose
+    positions (i, j), i < j, in the input come first.  In two dimensions
+    under the Euclidean metric, this is the pair fastClosestPair returns.
+
+    metric is 'euclidean', 'manhattan' or 'chebyshev', or a pair of
+    functions (kernel, cutoff): kernel maps a NumPy array of coordinate
+    differences, of shape (d, ...), to the distances along its first axis
+    (or to any increasing function of them; the Euclidean kernel leaves out
+    the square root), and cutoff maps a kernel value back to a distance.
+    Keeping the coordinates along the first axis makes each reduction a
+    series of elementwise operations on whole blocks of pairs.  Both searches rely on two
+    properties that hold for every Lp norm: no coordinate difference is
+    larger than the distance, and the distance does not decrease when a
+    coordinate difference grows.
+
+    Low dimensions, d <= treeDimension (see divideAndConquerND):
+        The points are sorted by their first coordinate and split in half at
+        every level, as in closestPair.  The split pairs closer than the best
+        distance, delta, found within the halves have both points in a slab
+        of width delta around the split, located by binary search.  When the
+        two sides of the slab form at most BLOCK_PAIRS pairs, all of them are
+        compared at once by the kernel, as a single NumPy block; otherwise
+        the slab is sorted by the second coordinate and swept in vectorized
+        rounds, pairing every point with the rth next one, until no points
+        within delta of each other along that coordinate are left.
+
+    High dimensions, d > treeDimension (see kdTreeND):
+        The slab around a split is no longer thin when d is large, so the
+        points are instead split into leaves of at most leafSize points by a
+        k-d tree, each leaf with a bounding box.  Every leaf is compared with
+        itself, and then with the other leaves in order of the distance
+        between their boxes (a lower bound on the distance between their
+        points), until that distance exceeds the best one found.  The other
+        leaves are compared in batches of up to about BLOCK_PAIRS pairs, each
+        as a single NumPy block.
+
+    Coincident points are looked for first (see duplicateRows and
+    duplicatePair), so both searches only ever see distinct points; a pair
+    of coincident points is the closest pair under any metric, and without
+    this check every point of a group of them would be compared with every
+    other, in quadratic time.
+
+    Without NumPy, only the named metrics are available, and the points are
+    swept along their first coordinate in pure Python instead.  The same goes
+    for int coordinates so large that a sum of squared differences could
+    overflow 64 bits (see fitsInt64); under a metric given as functions, such
+    coordinates are converted to floats.
+    '''
+
+    n = len(points)
+    if n < 2:
+        raise ValueError('At least two points are needed')
+
+    X = np.asarray(points) if np is not None else None
+    if X is not None and X.dtype.kind in 'iu' and not fitsInt64(X):
+        if isinstance(metric, str):
+            X = None                            #exact in pure Python
+        else:
+            X = X.astype(np.float64)
+
+    if X is None:
+        rows = [tuple(p) for p in (points.tolist() if hasattr(points, 'tolist') else points)]    #Python ints, for a NumPy array
+        pair = duplicatePair(rows)
+        i, j = pair if pair is not None else sweepND(rows, PYTHON_METRICS[metric])
+        if isinstance(points, list):
+            return (points[i], points[j])
+        return (rows[i], rows[j])
+
+    kernel, cutoff = METRICS[metric] if isinstance(metric, str) else metric
+    if X.dtype.kind not in 'iuf':
+        X = X.astype(np.float64)
+    elif X.dtype.kind in 'iu':
+        X = X.astype(np.int64)
+    leafSize = max(leafSize, 3)                 #halves of more than leafSize points hold at least two
+
+    pair = duplicateRows(X)
+    if pair is not None:
+        i, j = pair
+    elif X.shape[1] > treeDimension:
+        dist, i, j = kdTreeND(X, kernel, leafSize)
+    else:
+        dist, i, j = divideAndConquerND(X, kernel, cutoff, leafSize)
+
+    if isinstance(points, list):
+        return (points[i], points[j])
+    return (tuple(X[i].tolist()), tuple(X[j].tolist()))
+
+def fitsInt64(X):
+    '''
+    Whether the kernels can work on the ints of the NumPy array X, of shape
+    (n, d), in 64 bits: every coordinate difference is then below 2m, for the
+    largest absolute coordinate m, and d of them squared and summed stay below
+    2^63.
+    '''
+
+    m = max(-int(X.min()), int(X.max()))
+
+    return 4 * X.shape[1] * m * m < 2**63
+
+def bestPair(values, a, b):
+    '''
+    The smallest tuple (value, i, j), i < j, over a batch of pairs.
+
+    Input:  A NumPy array of kernel values, values, and NumPy arrays of the
+    input positions of the two points of each pair, a and b.
+    Output: The tuple, or None for an empty batch.
+    '''
+
+    if len(values) == 0:
+        return None
+
+    m = values.min()
+    tied = np.flatnonzero(values == m)
+    i = np.minimum(a[tied], b[tied])
+    j = np.maximum(a[tied], b[tied])
+    k = np.lexsort((j, i))[0]
+
+    return (m.item(), int(i[k]), int(j[k]))
+
+def better(best, candidate):
+    '''
+    The smaller of two (value, i, j) tuples, either of which may be None.
+    '''
+
+    if best is None or (candidate is not None and candidate < best):
+        return candidate
+
+    return best
+
+def blockPairs(A, B, ids, kernel, same = False):
+    '''
+    Compares every point of the block of rows A with every point of B as one
+    NumPy operation and returns the best pair (see bestPair).  ids holds the
+    input positions of the rows of A and B, as a pair of arrays; with same,
+    A and B are the same block and each pair is taken once.
+    '''
+
+    if len(A) == 0 or len(B) == 0:
+        return None
+
+    values = kernel(A.T[:, :, None] - B.T[:, None, :])
+    if same:
+        a, b = np.triu_indices(len(A), 1)
+        return bestPair(values[a, b], ids[0][a], ids[1][b])
+
+    values = values.ravel()
+    m = values.min()
+    tied = np.flatnonzero(values == m)          #only the positions of the best pairs are worked out
+    a, b = np.divmod(tied, len(B))
+    i = np.minimum(ids[0][a], ids[1][b])
+    j = np.maximum(ids[0][a], ids[1][b])
+    k = np.lexsort((j, i))[0]
+
+    return (m.item(), int(i[k]), int(j[k]))
+
+def divideAndConquerND(X, kernel, cutoff, leafSize):
+    '''
+    The low-dimensional search of closestPairND; returns the smallest tuple
+    (value, i, j) over all pairs of distinct rows of X.  In one dimension,
+    the only split pair that can be closest is the one straddling the split.
+    '''
+
+    order = np.lexsort(X.T[::-1])               #sorted by the first coordinate, then the others
+    S = X[order]
+    first = S[:, 0]
+
+    def solve(lo, hi):
+        '''
+        The best pair among the sorted rows [lo, hi).
+        '''
+
+        if hi - lo <= leafSize:
+            rows = order[lo:hi]
+            return blockPairs(S[lo:hi], S[lo:hi], (rows, rows), kernel, same = True)
+
+        mid = (lo + hi) // 2
+        best = better(solve(lo, mid), solve(mid, hi))
+        if S.shape[1] < 2:
+            return better(best, blockPairs(S[mid-1:mid], S[mid:mid+1], (order[mid-1:mid], order[mid:mid+1]), kernel))
+        delta = cutoff(best[0])
+
+        left = max(lo, int(np.searchsorted(first, first[mid] - delta, 'left')))
+        right = min(hi, int(np.searchsorted(first, first[mid-1] + delta, 'right')))
+        if (mid - left) * (right - mid) <= BLOCK_PAIRS:
+            return better(best, blockPairs(S[left:mid], S[mid:right], (order[left:mid], order[mid:right]), kernel))
+
+        slab = np.arange(left, right)
+        slab = slab[np.argsort(S[slab, 1], kind = 'stable')]
+        second = S[slab, 1]
+        side = slab >= mid
+        active = np.arange(len(slab))
+        r = 1
+        while True:
+            active = active[active + r < len(slab)]
+            active = active[second[active + r] - second[active] <= delta]      #once points r apart are too far apart, so are points further apart
+            if len(active) == 0:
+                break
+            split = active[side[active] != side[active + r]]
+            if len(split):
+                a = slab[split]
+                b = slab[split + r]
+                best = better(best, bestPair(kernel((S[a] - S[b]).T), order[a], order[b]))
+                delta = cutoff(best[0])
+            r += 1
+
+        return best
+
+    return solve(0, len(X))
+
+def kdTreeND(X, kernel, leafSize):
+    '''
+    The high-dimensional search of closestPairND; returns the smallest tuple
+    (value, i, j) over all pairs of rows of X.
+    '''
+
+    leaves = []
+    pending = [np.arange(len(X))]
+    while pending:
+        rows = pending.pop()
+        if len(rows) <= leafSize:
+            leaves.append(rows)
+            continue
+        P = X[rows]
+        dim = int(np.argmax(P.max(axis = 0) - P.min(axis = 0)))     #split the widest dimension at its median
+        half = len(rows) // 2
+        split = np.argpartition(P[:, dim], half)
+        pending.append(rows[split[:half]])
+        pending.append(rows[split[half:]])
+
+    low = np.array([X[rows].min(axis = 0) for rows in leaves])
+    high = np.array([X[rows].max(axis = 0) for rows in leaves])
+
+    best = None
+    for rows in leaves:
+        best = better(best, blockPairs(X[rows], X[rows], (rows, rows), kernel, same = True))
+
+    for a in range(len(leaves) - 1):
+        gaps = np.maximum(0, np.maximum(low[a+1:] - high[a], low[a] - high[a+1:]))
+        bounds = kernel(gaps.T)                 #no pair of points in the two boxes is closer than this
+        rows = leaves[a]
+        candidates = np.argsort(bounds, kind = 'stable')
+        k = 0
+        while k < len(candidates) and bounds[candidates[k]] <= best[0]:
+            batch = []                          #the next leaves, in order of their bounds, up to about BLOCK_PAIRS pairs
+            size = 0
+            while k < len(candidates) and bounds[candidates[k]] <= best[0] and size * len(rows) < BLOCK_PAIRS:
+                others = leaves[a + 1 + candidates[k]]
+                batch.append(others)
+                size += len(others)
+                k += 1
+            others = np.concatenate(batch)
+            best = better(best, blockPairs(X[rows], X[others], (rows, others), kernel))
+
+    return best
+
+def sweepND(points, distance):
+    '''
+    The pure Python search of closestPairND.
+
+    Input:  A list of tuples, points, and a function computing the kernel
+    value of the Euclidean, Manhattan or Chebyshev metric for two points,
+    distance.
+    Output: The positions (i, j), i < j, of the closest pair.
+
+    The points are sorted by their first coordinate, and each one is compared
+    with the following ones until their first coordinates alone are further
+    apart than the best distance so far.
+    '''
+
+    order = sorted(range(len(points)), key = points.__getitem__)
+    euclidean = distance is PYTHON_METRICS['euclidean']
+    best = None
+    for s in range(len(order) - 1):
+        i = order[s]
+        p = points[i]
+        for t in range(s + 1, len(order)):
+            j = order[t]
+            q = points[j]
+            gap = q[0] - p[0]
+            if best is not None and (gap * gap if euclidean else gap) > best[0]:
+                break
+            candidate = (distance(p, q), min(i, j), max(i, j))
+            if best is None or candidate < best:
+                best = candidate
+
+    return (best[1], best[2])
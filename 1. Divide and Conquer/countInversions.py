@@ -1,12 +1,28 @@
 # Michael D. Salerno
 
-def countInversions(arr):
+from array import array
+
+from fenwickTree import compress
+from radixSort import integerSort
+from vectorized import VECTOR_CUTOFF, np, numericArray
+
+INSERTION_CUTOFF = 16       #subarrays at or below this length are counted by insertion sort
+ENGINES = (None, 'merge', 'vector', 'fenwick')     #the counting methods countInversions can be asked for
+
+def countInversions(arr, returnSorted = False, vectorCutoff = VECTOR_CUTOFF, engine = None,
+                    workers = 1):
     '''
     My implementation of an O(nlog(n) algorithm for counting inversions in an 
     array.  
     
-    Input:  A list of comparable elements
-    Output: The number of inversions in the list
+    Input:  A list of comparable elements (or a numeric array.array or NumPy
+    array), arr, whether to return the sorted elements as well, returnSorted,
+    the length above which numeric input is counted with vectorized merges,
+    vectorCutoff, and the counting method, engine: 'merge', 'vector' or
+    'fenwick', or None to pick one automatically (see below), and the number
+    of worker processes to count with, workers.
+    Output: The number of inversions in the list, or, with returnSorted, a
+    tuple (count, sortedList).  The input is not modified.
     
     An inversion is defined as a pair of elements in an array A with indices
     (i, j) where i < j and A[i] > A[j].
@@ -33,42 +49,230 @@ def countInversions(arr):
     
     The left, right, and split inversions are summed and the total is returned
     along with the merged(sorted) array.  
+
+    As in mergeSort (see mergeSort.py), the halves are not sliced out and
+    popped from the front; the merges work by index on a copy of the input and
+    a single auxiliary buffer, which alternate as source and destination from
+    one level to the next.  Subarrays of length <= INSERTION_CUTOFF are sorted
+    by insertion sort instead, where every shift of an element past a larger
+    one undoes exactly one inversion, so the shifts are the count.  The sorted
+    list is a by-product, so returnSorted costs no extra pass.
+
+    When NumPy is available and arr is longer than vectorCutoff and holds only
+    ints or only floats (or is a numeric array.array or NumPy array), the
+    count is made with vectorized merges instead (see vectorSortAndCount).
+    Other lists of ints are counted by fenwickCount, which avoids the merges
+    altogether, unless the sorted list is wanted.  The 'fenwick' engine
+    accepts any hashable, comparable elements; with returnSorted, it sorts
+    them separately.  To count the inversions of a stream without holding all
+    of it, see InversionCounter (fenwickTree.py).
+
+    With workers > 1, a large list of ints or floats is split into chunks
+    that a pool of worker processes count and sort, and the split inversions
+    between the chunks are counted while they are merged in parallel (see
+    parallelCountInversions.py); the count is exactly the serial one.  Each
+    chunk is counted with the given engine and vectorCutoff.
     '''
-      
-    def sortAndCount(arr):
+
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine: %r' % (engine,))
+
+    if len(arr) < 2:         #no pairs; every engine accepts these, numeric or not
+        return (0, list(arr)) if returnSorted else 0
+
+    if workers > 1:
+        from parallelCountInversions import parallelCountInversions    #imported here because parallelCountInversions imports this module
+        return parallelCountInversions(arr, workers, returnSorted = returnSorted, vectorCutoff = vectorCutoff,
+                                       engine = engine)
+
+    if engine == 'vector' or (engine is None and len(arr) > vectorCutoff):
+        a = numericArray(arr)
+        if a is None and engine == 'vector':
+            raise ValueError('The vector engine needs NumPy and numeric input')
+        if a is not None:
+            count, sortedArr = vectorSortAndCount(a)
+            return (count, sortedArr.tolist()) if returnSorted else count
+
+    if engine == 'fenwick' or (engine is None and not returnSorted and all(type(x) is int for x in arr)):
+        count = fenwickCount(arr)
+        if returnSorted:
+            return (count, integerSort(list(arr)) or sorted(arr))
+        return count
+
+    result = list(arr)       #copy of the input; the sorted elements end up here
+    aux = result[:]          #the single auxiliary buffer
+
+    def sortAndCount(src, dst, lo, hi):
         '''
-        Internal routine containing the implementation.  It is called by the
-        wrapper in order to ultimately extract and return only the inversion
-        count.
-        
-        Input:  A list of comparable elements
-        Output: A tuple containing the list after sorting and the number of
-        inversions it originally contained.  (sortedList, count)
+        Internal routine containing the implementation.
+
+        Input:  Two lists, src and dst, holding the same elements in the range
+        [lo, hi), and the boundaries of that range.
+        Output: The number of inversions in that range; dst[lo:hi] ends up
+        holding its elements in sorted order.
+
+        The halves are sorted into src, using dst as their source, and then
+        merged back into dst, as in mergeSort.
         '''
-        
-        if len(arr) == 1:
-            return (arr, 0)
-            
-        (lhs, countLeft) = sortAndCount(arr[:len(arr)/2])
-        (rhs, countRight) = sortAndCount(arr[len(arr)/2:])
-        
-        mergedArr = []
-        countSplits = 0
-        
-        while len(lhs) != 0 and len(rhs) != 0:
-            if lhs[0] <= rhs[0]:
-                mergedArr.append(lhs.pop(0))
-            else:
-                mergedArr.append(rhs.pop(0))
-                countSplits += len(lhs)
-                
-        total = countLeft + countRight + countSplits
-                
-        if len(lhs) == 0:
-            mergedArr += rhs
+
+        if hi - lo <= INSERTION_CUTOFF:
+            return insertionCount(dst, lo, hi)
+
+        mid = (lo + hi) // 2
+        countLeft = sortAndCount(dst, src, lo, mid)     #swap roles; the sorted halves land in src
+        countRight = sortAndCount(dst, src, mid, hi)
+
+        return countLeft + countRight + mergeAndCount(src, dst, lo, mid, hi)
+
+    count = sortAndCount(aux, result, 0, len(result))
+
+    return (count, result) if returnSorted else count
+
+def mergeAndCount(src, dst, lo, mid, hi):
+    '''
+    Merges the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi] and
+    returns the number of split inversions between them.
+
+    Each time an element of the right run is merged ahead of the elements
+    remaining in the left run, it forms an inversion with every one of them.
+    Equal elements are taken from the left run first, since they are not
+    inversions.
+    '''
+
+    i = lo
+    j = mid
+    k = lo
+    count = 0
+    while i < mid and j < hi:
+        x = src[i]
+        y = src[j]
+        if x <= y:
+            dst[k] = x
+            i += 1
         else:
-            mergedArr += lhs
-            
-        return (mergedArr, total)
-        
-    return sortAndCount(arr)[1]
\ No newline at end of file
+            dst[k] = y
+            j += 1
+            count += mid - i
+        k += 1
+
+    if i < mid:                         #copy whichever run has elements left
+        dst[k:hi] = src[i:mid]
+    else:
+        dst[k:hi] = src[j:hi]
+
+    return count
+
+def insertionCount(A, lo, hi):
+    '''
+    Sorts A[lo:hi] in place by insertion sort and returns the number of
+    inversions it contained, which is the number of positions the elements
+    were shifted by.
+    '''
+
+    count = 0
+    for j in range(lo+1, hi):
+        x = A[j]
+        i = j - 1
+        while i >= lo and A[i] > x:
+            A[i+1] = A[i]
+            i -= 1
+        A[i+1] = x
+        count += j - 1 - i
+
+    return count
+
+def vectorSortAndCount(a):
+    '''
+    Bottom-up merge count of a NumPy array with vectorized merges.
+
+    Input:  A one-dimensional NumPy array, a.
+    Output: A tuple (count, sortedArray) of the number of inversions in a and
+    a new array of its elements in sorted order.  a is not modified.
+
+    The elements are first replaced by their dense ranks, 0..m-1, and the
+    array is padded with the rank m up to a power of two length (padding with
+    elements larger than all others, at the end, adds no inversions).  Then,
+    for widths w = 1, 2, 4, ..., every pair of adjacent sorted runs of length
+    w is merged at once: adding row*(m+1) to the ranks in the rth pair of
+    runs makes the concatenation of all the left runs one sorted array, so a
+    single binary search (searchsorted) of every element of the right runs
+    among the left runs counts, for each of them, the left elements <= it.
+    The rest of its run's w left elements are its split inversions.  The same
+    counts give every element's position in the merged run, as in
+    vectorMergeSort (see vectorized.py), so the merge is a single scatter.
+    Each of the log2(n) levels takes O(nlog(n)) time in compiled code.
+    '''
+
+    n = len(a)
+    values, ranks = np.unique(a, return_inverse = True)
+    if n < 2:
+        return (0, values[ranks])
+    m = len(values)
+
+    size = 1 << (n - 1).bit_length()
+    r = np.full(size, m, dtype = np.int64)
+    r[:n] = ranks.reshape(-1)
+    out = np.empty_like(r)
+
+    count = 0
+    width = 1
+    while width < size:
+        rows = size // (2 * width)
+        pairs = r.reshape(rows, 2 * width) + (np.arange(rows, dtype = np.int64) * (m + 1))[:, None]
+        L = pairs[:, :width].ravel()
+        R = pairs[:, width:].ravel()
+        start = np.repeat(np.arange(rows, dtype = np.int64) * width, width)    #index in L of each run's first element
+
+        leftLessEqual = np.searchsorted(L, R, 'right') - start      #left elements <= each right element
+        rightLess = np.searchsorted(R, L, 'left') - start           #right elements < each left element
+        count += int((width - leftLessEqual).sum())
+
+        within = np.tile(np.arange(width, dtype = np.int64), rows)
+        base = 2 * start
+        rr = r.reshape(rows, 2 * width)
+        out[base + within + rightLess] = rr[:, :width].ravel()
+        out[base + within + leftLessEqual] = rr[:, width:].ravel()
+        r, out = out, r
+        width *= 2
+
+    return (count, values[r[:n]])
+
+def fenwickCount(arr):
+    '''
+    Counts the inversions in a list with a Fenwick tree (binary indexed tree).
+
+    Input:  A list of hashable, comparable elements, arr.
+    Output: The number of inversions in the list
+
+    Each element is replaced by its rank among the distinct elements, 1..m
+    (see compress in fenwickTree.py).  The list of ranks is then scanned from
+    left to right while a Fenwick tree over an array of m + 1 counts records
+    how many elements of each rank have been seen.  The ith element forms an inversion with every
+    earlier element of higher rank, and there are i minus (the number of
+    earlier elements of rank <= its own) of those; a prefix sum over the tree.
+    Prefix sums and updates each touch O(log(m)) entries of the tree, one per
+    set bit of the index, so the count takes O(nlog(n)) time with no merging
+    or copying of the list.  The tree operations are written out inline
+    rather than calling FenwickTree's methods, which keeps the loop tight.
+    '''
+
+    if len(arr) < 2:
+        return 0
+
+    ranks, m = compress(list(arr))
+
+    tree = array('l', [0]) * (m + 1)     #tree[j] counts the elements seen with ranks in (j - lowbit(j), j]
+    count = 0
+    for i, r in enumerate(ranks):
+        j = r
+        seen = 0                         #earlier elements of rank <= r
+        while j:
+            seen += tree[j]
+            j &= j - 1                   #clear the lowest set bit
+        count += i - seen
+
+        while r <= m:
+            tree[r] += 1
+            r += r & -r                  #add the lowest set bit
+
+    return count
\ No newline at end of file
@@ -0,0 +1,42 @@
+# Michael D. Salerno
+
+def decorate(A, key = None, reverse = False):
+    '''
+    The first step of decorate-sort-undecorate (the Schwartzian transform),
+    used by the sorters to support key and reverse arguments.
+
+    Input:  A sequence of elements, A, a function of one argument computing
+    the key each element is sorted by, key (None sorts by the elements
+    themselves), and whether to sort in descending order, reverse.
+    Output: A new list of tuples (key(x), i, x) for the elements x of A at
+    positions i, or (key(x), -i, x) if reverse is set.
+
+    The key of each element is computed exactly once, here, instead of on
+    every comparison.  Since the positions are distinct, two tuples never tie,
+    so the elements themselves are never compared (they need not even be
+    comparable) and any sort of the tuples orders elements with equal keys by
+    their original position; the result is stable even for the unstable
+    sorters.  For reverse, the tuples are sorted in ascending order and read
+    back from the end (see undecorate), and negating the positions keeps
+    elements with equal keys in their original order.
+    '''
+
+    keys = A if key is None else map(key, A)
+    if reverse:
+        return [(k, -i, x) for i, (k, x) in enumerate(zip(keys, A))]
+
+    return [(k, i, x) for i, (k, x) in enumerate(zip(keys, A))]
+
+def undecorate(D, reverse = False):
+    '''
+    The last step of decorate-sort-undecorate.
+
+    Input:  A sorted list of tuples built by decorate, D, and the reverse
+    flag that was passed to decorate.
+    Output: A new list of the original elements in sorted order.
+    '''
+
+    if reverse:
+        return [d[2] for d in reversed(D)]
+
+    return [d[2] for d in D]
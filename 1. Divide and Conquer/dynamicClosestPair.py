@@ -0,0 +1,402 @@
+# Michael D. Salerno
+
+from math import inf
+from operator import itemgetter
+
+from heap import MinHeap
+
+DIRECTIONS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))    #cone k lies between DIRECTIONS[k] and DIRECTIONS[k+1]; 8 cones of 45 degrees
+CONES = tuple(DIRECTIONS[k] + DIRECTIONS[(k + 1) % 8] for k in range(8))                #the two bounding directions of each cone, flattened
+
+class KdTree(object):
+    '''
+    A static 2-d tree over a set of distinct points, for nearest neighbour
+    queries.
+
+    Input:  The points sorted by x, px, and by y, py.
+
+    The tree is stored implicitly in an array, as a binary search tree over
+    positions: the node of a range [lo, hi) is at position mid = (lo + hi)//2,
+    its left subtree covers [lo, mid) and its right subtree [mid + 1, hi).
+    Levels alternate between splitting at the median x and the median y.  As
+    in closestPair, the median of each range is read off whichever of the two
+    presorted lists is sorted by the splitting coordinate, and both lists are
+    split in O(n) time, so the tree is built in O(nlog(n)) time without
+    sorting again.  The left subtree of a node holds no point beyond its
+    splitting line, and the right subtree none before it, so the bounding box
+    of a range is that of the whole tree, cut down by the splitting lines
+    passed on the way to it.
+    '''
+
+    def __init__(self, px, py):
+        self.nodes = [None] * len(px)
+        self.build(0, len(px), px, py, 0)
+        if px:
+            self.box = (px[0][0], px[-1][0], py[0][1], py[-1][1])      #(min x, max x, min y, max y)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def build(self, lo, hi, px, py, axis):
+        if lo == hi:
+            return
+
+        mid = (lo + hi) // 2
+        byAxis, other = (px, py) if axis == 0 else (py, px)
+        k = mid - lo
+        self.nodes[mid] = byAxis[k]
+        left = set(byAxis[:k])
+        otherLeft = [p for p in other if p in left]
+        otherRight = [p for p in other if p not in left and p != byAxis[k]]
+
+        if axis == 0:
+            self.build(lo, mid, byAxis[:k], otherLeft, 1)
+            self.build(mid + 1, hi, byAxis[k+1:], otherRight, 1)
+        else:
+            self.build(lo, mid, otherLeft, byAxis[:k], 0)
+            self.build(mid + 1, hi, otherRight, byAxis[k+1:], 0)
+
+    def nearest(self, q, live, best):
+        '''
+        Finds the nearest point to q other than q itself.
+
+        Input:  A point, q, a container of the points that are still present,
+        live (the others are skipped), and the best candidate so far, as a
+        list [squared distance, point].
+        Output: No output (best is updated in place).
+
+        The subtree on q's side of each split is searched first, and the
+        other one only if the splitting line is closer than the best
+        candidate.
+        '''
+
+        nodes = self.nodes
+        qx, qy = q
+        stack = [(0, len(nodes), 0, 0)]           #(lo, hi, axis, squared distance from q to the range's side of the split)
+        while stack:
+            lo, hi, axis, bound = stack.pop()
+            if lo == hi or bound >= best[0]:      #the best candidate may have improved since the range was pushed
+                continue
+            mid = (lo + hi) // 2
+            p = nodes[mid]
+            dx = p[0] - qx
+            dy = p[1] - qy
+            dist = dx*dx + dy*dy
+            if dist < best[0] and p != q and p in live:
+                best[0] = dist
+                best[1] = p
+
+            gap = dx if axis == 0 else dy         #from q to the splitting line
+            if gap >= 0:
+                stack.append((mid + 1, hi, 1 - axis, gap * gap))
+                stack.append((lo, mid, 1 - axis, 0))                #popped first
+            else:
+                stack.append((lo, mid, 1 - axis, gap * gap))
+                stack.append((mid + 1, hi, 1 - axis, 0))
+
+    def nearestInCones(self, q, live, best):
+        '''
+        Finds, for each of the 8 cones of 45 degrees with apex q (see
+        DIRECTIONS), the nearest point other than q that lies in it.
+
+        Input:  A point, q, a container of the points that are still present,
+        live, and the best candidate so far in each cone, as a list of 8 lists
+        [squared distance, point].
+        Output: No output (best is updated in place).
+
+        The cones are closed, so a point on the boundary of two counts for
+        both.  A range is searched only if its bounding box is closer than
+        the best candidate of some cone that the box meets.
+        '''
+
+        nodes = self.nodes
+        if not nodes:
+            return
+        qx, qy = q
+        x0, x1, y0, y1 = self.box
+        stack = [(0, len(nodes), 0, x0 - qx, x1 - qx, y0 - qy, y1 - qy)]      #(lo, hi, axis, box relative to q)
+        while stack:
+            lo, hi, axis, x0, x1, y0, y1 = stack.pop()
+            if lo == hi:
+                continue
+            gx = max(x0, -x1, 0)
+            gy = max(y0, -y1, 0)
+            bound = gx*gx + gy*gy
+            if not any(bound < best[k][0] and coneMeetsBox(k, x0, x1, y0, y1) for k in range(8)):
+                continue
+
+            mid = (lo + hi) // 2
+            p = nodes[mid]
+            vx = p[0] - qx
+            vy = p[1] - qy
+            if p != q and p in live:
+                dist = vx*vx + vy*vy
+                for k in range(8):
+                    if dist < best[k][0] and inCone(k, vx, vy):
+                        best[k][0] = dist
+                        best[k][1] = p
+
+            if axis == 0:
+                left = (lo, mid, 1, x0, vx, y0, y1)
+                right = (mid + 1, hi, 1, vx, x1, y0, y1)
+            else:
+                left = (lo, mid, 0, x0, x1, y0, vy)
+                right = (mid + 1, hi, 0, x0, x1, vy, y1)
+            if (vx if axis == 0 else vy) >= 0:        #search q's side of the splitting line first
+                stack.append(right)
+                stack.append(left)
+            else:
+                stack.append(left)
+                stack.append(right)
+
+def inCone(k, vx, vy):
+    '''
+    Whether the vector (vx, vy) lies in the closed cone k (see DIRECTIONS).
+    '''
+
+    a0, a1, b0, b1 = CONES[k]
+
+    return a0*vy - a1*vx >= 0 and vx*b1 - vy*b0 >= 0
+
+def coneMeetsBox(k, x0, x1, y0, y1):
+    '''
+    Whether the closed cone k, with its apex at the origin, meets the box
+    [x0, x1] x [y0, y1].  Both are convex, so they meet exactly when the box
+    holds the apex, the cone holds a corner of the box, or one of the two
+    rays bounding the cone crosses the box.
+    '''
+
+    if x0 <= 0 <= x1 and y0 <= 0 <= y1:
+        return True
+    a0, a1, b0, b1 = CONES[k]
+    for cx, cy in ((x0, y0), (x0, y1), (x1, y0), (x1, y1)):
+        if a0*cy - a1*cx >= 0 and cx*b1 - cy*b0 >= 0:
+            return True
+
+    for dx, dy in ((a0, a1), (b0, b1)):
+        tlo = 0
+        thi = inf
+        for d, lo, hi in ((dx, x0, x1), (dy, y0, y1)):     #the times t >= 0 at which t*(dx, dy) is within the box along each axis
+            if d == 0:
+                if not lo <= 0 <= hi:
+                    thi = -1
+            elif d > 0:
+                tlo = max(tlo, lo)
+                thi = min(thi, hi)
+            else:
+                tlo = max(tlo, -hi)
+                thi = min(thi, -lo)
+        if tlo <= thi:
+            return True
+
+    return False
+
+class DynamicClosestPair(object):
+    '''
+    Maintains the closest pair of a set of points in the plane under
+    insertions and deletions.
+
+    Input:  An initial collection of tuples representing the x and y
+    coordinates of points, points.
+
+    Procedure:
+        - The points are kept in a few static KdTrees with sizes of
+          distinct powers of two (the logarithmic method of Bentley and
+          Saxe): an insertion merges the trees of sizes 1, 2, 4, ... up to the
+          first missing size into one new tree, like a carry in binary
+          addition, so each point takes part in O(log(n)) rebuilds.  Deleted
+          points are only marked as gone, and everything is rebuilt once they
+          outnumber the points still present.  A nearest neighbour query
+          searches each tree, O(log(n)) trees of O(log(n)) expected depth.
+          The initial points are sorted by x and y once, as in closestPair,
+          and built into one tree from those lists.
+        - Every point p records a nearest neighbour, nn(p), and the pair
+          (squared distance, p, nn(p)) is kept in a MinHeap (see heap.py),
+          one entry per point.  Each point also keeps the set of points whose
+          recorded neighbour it is.  The records are kept exact: nn(p) is
+          always a nearest neighbour of p among the points present.
+        - insert(p) computes nn(p) and adds p's entry, and then re-points
+          every point that p is now strictly closer to than its recorded
+          neighbour (see claimNeighbours).
+        - delete(p) removes p's entry, and recomputes the nearest neighbour of
+          every point that recorded p as theirs; no other record can change.
+        - closest() reads the pair at the top of the heap, which, with exact
+          records, is a closest pair.
+
+    Finding the points that p becomes the nearest neighbour of: split the
+    plane around p into 8 cones of 45 degrees (see DIRECTIONS).  If q is the
+    point of a cone nearest to p, any other point q' of that cone at least as
+    far from p is at least as close to q as to p (the angle qpq' is at most 60
+    degrees), so p is not strictly closer to q' than nn(q') is.  Only the
+    nearest point of each cone can need re-pointing, and these are found by
+    one search of each tree (see KdTree.nearestInCones).
+
+    With exact records, a point is the recorded neighbour of at most 6
+    others in the plane (the kissing number), so a deletion recomputes at
+    most 6 nearest neighbours.  Each update therefore costs O(1) tree
+    searches, O(log(n)) expected time each in each of the O(log(n)) trees,
+    O(log(n)) heap operations and amortized O(log^2(n)) tree rebuilding.
+
+    Coincident points are counted rather than stored twice; while any point
+    is present more than once, closest() returns that point twice.
+    '''
+
+    def __init__(self, points = ()):
+        self.count = {}                            #point -> number of copies present
+        for p in points:
+            self.count[p] = self.count.get(p, 0) + 1
+        self.duplicates = set(p for p, c in self.count.items() if c > 1)
+
+        px = sorted(self.count, key = itemgetter(0, 1))
+        py = sorted(self.count, key = itemgetter(1, 0))
+        self.trees = [None] * len(px).bit_length()
+        if px:
+            self.trees.append(KdTree(px, py))      #one tree of size n, at the level above all the empty ones
+        self.stored = len(px)                      #points in the trees, including deleted ones
+
+        self.nn = {}                               #point -> (squared distance, nearest neighbour) when last computed
+        self.recordedBy = {}                       #point -> set of the points whose recorded neighbour it is
+        self.heap = MinHeap()
+        for p in px:
+            self.recordedBy[p] = set()
+        for p in px:
+            self.findNeighbour(p)
+
+    def __len__(self):
+        return sum(self.count.values())
+
+    def __contains__(self, p):
+        return p in self.count
+
+    def findNeighbour(self, p):
+        '''
+        Computes and records the nearest neighbour of the present point p,
+        and adds p's entry to the heap.
+        '''
+
+        best = [inf, None]
+        for tree in self.trees:
+            if tree is not None:
+                tree.nearest(p, self.count, best)
+
+        if best[1] is not None:
+            self.nn[p] = (best[0], best[1])
+            self.recordedBy[best[1]].add(p)
+            self.heap.insert((best[0], p, best[1]))
+
+    def forgetNeighbour(self, p):
+        '''
+        Removes p's entry from the heap and from its neighbour's records.
+        '''
+
+        if p in self.nn:
+            dist, q = self.nn.pop(p)
+            self.heap.delete((dist, p, q))
+            if q in self.recordedBy:
+                self.recordedBy[q].discard(p)
+
+    def insert(self, p):
+        '''
+        Adds the point p.
+        '''
+
+        if p in self.count:
+            self.count[p] += 1
+            self.duplicates.add(p)
+            return
+
+        self.count[p] = 1
+        self.recordedBy[p] = set()
+
+        carry = set([p])                           #merge the trees of sizes 1, 2, 4, ... like a binary carry
+        level = 0
+        while level < len(self.trees) and self.trees[level] is not None:
+            carry.update(q for q in self.trees[level].nodes if q in self.count)
+            self.trees[level] = None
+            level += 1
+        self.place(carry)
+        self.stored = sum(len(tree) for tree in self.trees if tree is not None)
+
+        self.findNeighbour(p)
+        self.claimNeighbours(p)
+
+    def claimNeighbours(self, p):
+        '''
+        Re-points to the newly inserted point p every point that p is
+        strictly closer to than its recorded neighbour; the candidates are
+        the nearest points to p in each of the 8 cones around it.
+        '''
+
+        best = [[inf, None] for k in range(8)]
+        for tree in self.trees:
+            if tree is not None:
+                tree.nearestInCones(p, self.count, best)
+
+        for dist, q in best:
+            if q is not None and dist < self.nn.get(q, (inf,))[0]:     #a point found in two cones is re-pointed once
+                self.forgetNeighbour(q)
+                self.nn[q] = (dist, p)
+                self.recordedBy[p].add(q)
+                self.heap.insert((dist, q, p))
+
+    def delete(self, p):
+        '''
+        Removes one copy of the point p.
+        '''
+
+        if p not in self.count:
+            raise KeyError(p)
+
+        if self.count[p] > 1:
+            self.count[p] -= 1
+            if self.count[p] == 1:
+                self.duplicates.discard(p)
+            return
+
+        del self.count[p]
+        self.forgetNeighbour(p)
+        for q in self.recordedBy.pop(p):
+            dist, r = self.nn.pop(q)
+            self.heap.delete((dist, q, r))
+            self.findNeighbour(q)
+
+        if 2 * len(self.count) < self.stored:      #more deleted points than present ones; rebuild
+            self.trees = []
+            self.place(set(self.count))
+            self.stored = len(self.count)
+
+    def place(self, points):
+        '''
+        Builds a KdTree of a set of points and stores it at the level of the
+        smallest power of two that holds them.  A deleted point that has been
+        inserted again may still sit in another tree, so the points are
+        gathered in a set, to store each of them at most once per tree.
+        '''
+
+        level = max(0, (len(points) - 1).bit_length())
+        while len(self.trees) <= level:
+            self.trees.append(None)
+        if self.trees[level] is not None:          #only after a rebuild; merge upwards
+            points = points | set(q for q in self.trees[level].nodes if q in self.count)
+            self.trees[level] = None
+            self.place(points)
+            return
+
+        px = sorted(points, key = itemgetter(0, 1))
+        py = sorted(points, key = itemgetter(1, 0))
+        self.trees[level] = KdTree(px, py)
+
+    def closest(self):
+        '''
+        Returns a closest pair of points present, as a tuple (p, q), or None
+        if there are fewer than two points.
+        '''
+
+        if self.duplicates:
+            p = min(self.duplicates)
+            return (p, p)
+        if self.heap.is_empty():
+            return None
+
+        dist, p, q = self.heap.elements[0]
+        return (p, q)
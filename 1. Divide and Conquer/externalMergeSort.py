@@ -0,0 +1,133 @@
+# Michael D. Salerno
+
+import os
+import tempfile
+
+from heap import MinHeap
+from mergeSort import bottomUpMergeSort
+
+BYTES_PER_ELEMENT = 100    #rough cost of one parsed integer held in memory while its chunk is sorted
+MIN_BUFFER_SIZE = 4096     #never use read/write buffers smaller than a typical disk block
+
+def externalMergeSort(inputFile, outputFile, memory = 64 * 1024**2, fanIn = 16, tempDir = None):
+    '''
+    My implementation of an external (out-of-core) Merge Sort for files of
+    integers that are too large to be sorted in memory.
+
+    Input:  The path of a file containing one integer per line, inputFile (the
+    format of quicksort_test_data.txt), the path of the file to write the
+    sorted integers to, outputFile, the approximate number of bytes of memory
+    the sort may use, memory, the maximum number of sorted runs merged at
+    once, fanIn, and optionally the directory in which the temporary directory
+    holding the run files is created, tempDir.
+    Output: The number of integers sorted.  outputFile is written in the same
+    one-integer-per-line format.
+
+    The sort proceeds in two phases:
+
+    1. Run formation:  The input is streamed in chunks of as many integers as
+       fit in the memory budget.  Each chunk is sorted in memory with
+       bottomUpMergeSort (see mergeSort.py) and spilled to a temporary file as
+       a sorted run.  A file of n integers produces about n/m runs, where m is
+       the chunk size.
+    2. Merging:  Up to fanIn runs at a time are merged into one by a k-way
+       merge.  The smallest unmerged element of every run is kept in a
+       MinHeap, so each output element costs O(log(k)) work.  While more than
+       fanIn runs remain, groups of fanIn runs are merged into longer runs;
+       the final pass writes directly to outputFile.
+
+    The number of merge passes is about log_fanIn(n/m), and each pass reads
+    and writes every element once; thus, the sort performs O(n*log_fanIn(n/m))
+    I/O on top of the O(nlog(n)) comparisons.  The memory budget is split
+    evenly between the read buffers of the runs being merged, so a larger
+    fanIn means fewer passes but smaller, less efficient reads.
+    '''
+
+    if fanIn < 2:
+        raise ValueError('fanIn must be at least 2; a 1-way merge makes no progress.')
+
+    chunkSize = max(1, memory // BYTES_PER_ELEMENT)
+    bufferSize = max(MIN_BUFFER_SIZE, memory // (fanIn + 1))   #one read buffer per merged run, plus the output buffer
+
+    with tempfile.TemporaryDirectory(dir = tempDir) as workDir:    #holds every run file; removed with them even if a pass fails
+        runs = []
+        with open(inputFile) as f:                #phase 1: form sorted runs
+            count = 0
+            chunk = []
+            for line in f:
+                line = line.strip()
+                if line:
+                    chunk.append(int(line))
+                    if len(chunk) == chunkSize:
+                        runs.append(spillRun(bottomUpMergeSort(chunk), workDir))
+                        count += len(chunk)
+                        chunk = []
+            if chunk or not runs:
+                runs.append(spillRun(bottomUpMergeSort(chunk), workDir))
+                count += len(chunk)
+
+        while len(runs) > fanIn:                  #phase 2: intermediate merge passes
+            merged = []
+            for i in range(0, len(runs), fanIn):
+                group = runs[i:i+fanIn]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                fd, path = tempfile.mkstemp(suffix = '.run', dir = workDir)
+                with os.fdopen(fd, 'w', bufferSize) as out:
+                    mergeRuns(group, out, bufferSize)
+                merged.append(path)
+                for run in group:                 #free the disk space of merged runs as the pass goes
+                    os.remove(run)
+            runs = merged
+
+        with open(outputFile, 'w', bufferSize) as out:    #final pass writes the result
+            mergeRuns(runs, out, bufferSize)
+
+    return count
+
+def spillRun(run, tempDir = None):
+    '''
+    Writes a sorted run to a new temporary file, one integer per line.
+
+    Input:  A sorted list of integers and the directory to create the file in.
+    Output: The path of the temporary file.
+    '''
+
+    fd, path = tempfile.mkstemp(suffix = '.run', dir = tempDir)
+    with os.fdopen(fd, 'w') as out:
+        out.writelines('%d\n' % x for x in run)
+
+    return path
+
+def mergeRuns(runs, out, bufferSize = MIN_BUFFER_SIZE):
+    '''
+    k-way merge of sorted run files.
+
+    Input:  A list of paths to files of sorted integers, runs, an open file to
+    write the merged integers to, out, and the read buffer size per run.
+    Output: No output (the merged integers are written to out).
+
+    The heap holds (value, run index) pairs, at most one per run, so the pairs
+    are always distinct (as MinHeap requires) and ties are broken in favour of
+    the earlier run.
+    '''
+
+    files = [open(run, 'r', bufferSize) for run in runs]
+    try:
+        heads = []
+        for i, f in enumerate(files):
+            line = f.readline()
+            if line:
+                heads.append((int(line), i))
+        heap = MinHeap(heads)
+
+        while not heap.is_empty():
+            value, i = heap.extract_min()
+            out.write('%d\n' % value)
+            line = files[i].readline()
+            if line:
+                heap.insert((int(line), i))
+    finally:
+        for f in files:
+            f.close()
@@ -0,0 +1,251 @@
+# Michael D. Salerno
+
+from array import array
+from collections import deque
+
+from radixSort import COUNTING_FACTOR, integerSort
+
+class FenwickTree(object):
+    '''
+    My implementation of a Fenwick tree (binary indexed tree) of integer
+    counts at the positions 1..size.
+
+    Input:  The number of positions, size.
+
+    The counts are kept in an array of size + 1 machine integers, where
+    tree[j] holds the sum of the counts at the positions in
+    (j - lowbit(j), j] and lowbit(j) is the lowest set bit of j.  A prefix sum
+    adds up the entries reached from i by clearing its set bits one at a time,
+    and an update adjusts the entries reached from i by repeatedly adding its
+    lowest set bit; both touch O(log(size)) entries.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = array('l', [0]) * (size + 1)
+
+    def add(self, i, delta = 1):
+        '''
+        Adds delta to the count at position i, 1 <= i <= size.
+        '''
+
+        tree = self.tree
+        size = self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i                  #add the lowest set bit
+
+    def prefixSum(self, i):
+        '''
+        Returns the sum of the counts at the positions 1..i.
+        '''
+
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i &= i - 1                   #clear the lowest set bit
+
+        return total
+
+    def total(self):
+        '''
+        Returns the sum of all the counts.
+        '''
+
+        return self.prefixSum(self.size)
+
+def compress(arr):
+    '''
+    Coordinate compression; replaces each element by its rank among the
+    distinct elements.
+
+    Input:  A list of hashable, comparable elements, arr.
+    Output: A tuple (ranks, m) of a new list of the ranks, 1..m, of the
+    elements of arr, and the number of ranks, m.
+
+    Lists of ints whose values span at most COUNTING_FACTOR*n integers use
+    x - min + 1 as the rank directly (m is then the span, and some ranks may go
+    unused); otherwise the distinct elements are sorted, by integerSort (see
+    radixSort.py) when they are ints, and looked up in a dictionary.
+    '''
+
+    n = len(arr)
+    if n == 0:
+        return ([], 0)
+
+    if all(type(x) is int for x in arr):
+        lo = min(arr)
+        hi = max(arr)
+        if hi - lo < COUNTING_FACTOR * n:
+            return ([x - lo + 1 for x in arr], hi - lo + 1)
+
+    distinct = list(set(arr))
+    values = integerSort(distinct) or sorted(distinct)
+    rank = dict(zip(values, range(1, len(values) + 1)))
+
+    return ([rank[x] for x in arr], len(values))
+
+class InversionCounter(object):
+    '''
+    Counts the inversions of a sequence whose elements arrive one at a time.
+
+    Input:  The universe of values the elements are drawn from, universe:
+    either a range of ints with step 1, or any iterable of hashable,
+    comparable values.
+
+    The values of the universe are compressed to ranks 1..m once, up front (a
+    range needs no lookup table; the rank of x is x - start + 1), and a
+    FenwickTree over the ranks records how many elements of each rank have
+    been fed so far.  A new element forms an inversion with every earlier
+    element of higher rank, so feeding it adds the number of elements seen
+    minus the prefix sum up to its rank to the count; O(log(m)) time per
+    element, and O(m) memory regardless of the length of the stream.
+
+    Attributes:
+        inversions:  the number of inversions among the elements fed so far.
+        count:  the number of elements fed so far.
+    '''
+
+    def __init__(self, universe):
+        if isinstance(universe, range) and universe.step == 1:
+            self.start = universe.start
+            self.rank = None
+            m = len(universe)
+        else:
+            distinct = list(set(universe))
+            values = integerSort(distinct) or sorted(distinct)
+            self.start = None
+            self.rank = dict(zip(values, range(1, len(values) + 1)))
+            m = len(values)
+
+        self.tree = FenwickTree(m)
+        self.inversions = 0
+        self.count = 0
+
+    def rankOf(self, x):
+        '''
+        Returns the rank of the value x in the universe.
+        '''
+
+        if self.rank is not None:
+            if x not in self.rank:
+                raise ValueError('%r is not in the universe' % (x,))
+            return self.rank[x]
+
+        r = x - self.start + 1
+        if not 1 <= r <= self.tree.size:
+            raise ValueError('%r is not in the universe' % (x,))
+        return r
+
+    def feed(self, x):
+        '''
+        Appends x to the sequence and returns the number of inversions it
+        forms with the earlier elements.
+        '''
+
+        return self.feedRank(self.rankOf(x))
+
+    def feedRank(self, r):
+        '''
+        Appends an element of rank r to the sequence and returns the number
+        of inversions it forms with the earlier elements.
+        '''
+
+        new = self.count - self.tree.prefixSum(r)      #earlier elements of higher rank
+        self.tree.add(r)
+        self.count += 1
+        self.inversions += new
+
+        return new
+
+    def extend(self, iterable):
+        '''
+        Feeds every element of iterable, in order, and returns the updated
+        number of inversions.
+        '''
+
+        for x in iterable:
+            self.feed(x)
+
+        return self.inversions
+
+class SlidingInversionCounter(InversionCounter):
+    '''
+    Maintains the number of inversions among the most recent elements of a
+    stream, as elements are pushed onto the newest end and popped off the
+    oldest end.
+
+    Input:  The universe of values the elements are drawn from, universe (see
+    InversionCounter), and optionally the length of the window, window; when
+    set, pushing an element onto a full window pops the oldest one.
+
+    Pushing x works as InversionCounter.feed (feed and extend push as well,
+    so every element in the tree is also in the window).  The oldest element
+    comes before every other element of the window, so it forms an inversion
+    with each of them of lower rank; popping it removes it from the tree and
+    subtracts the prefix sum up to the rank below its own.  Both take
+    O(log(m)) time for a universe of m values, so the count for each position
+    of a sliding window costs O(log(m)) instead of a full recount.
+
+    Attributes:
+        inversions:  the number of inversions among the elements in the window.
+        count:  the number of elements in the window.
+    '''
+
+    def __init__(self, universe, window = None):
+        InversionCounter.__init__(self, universe)
+        self.window = window
+        self.elements = deque()          #(x, rank of x) for the elements in the window, oldest first
+
+    def __len__(self):
+        return self.count
+
+    def push(self, x):
+        '''
+        Appends x to the window, first popping the oldest element if the
+        window is full, and returns the number of inversions x forms with the
+        other elements.
+        '''
+
+        r = self.rankOf(x)              #before popping, so that a value outside the universe leaves the window as it was
+        if self.window is not None and self.count >= self.window:
+            self.pop_oldest()
+        self.elements.append((x, r))
+
+        return self.feedRank(r)
+
+    feed = push
+
+    def pop_oldest(self):
+        '''
+        Removes the oldest element from the window and returns it.
+        '''
+
+        if not self.elements:
+            raise IndexError('pop from empty window')
+
+        x, r = self.elements.popleft()
+        self.tree.add(r, -1)
+        self.count -= 1
+        self.inversions -= self.tree.prefixSum(r - 1)      #later elements of lower rank
+
+        return x
+
+def slidingInversions(arr, window, universe = None):
+    '''
+    Counts the inversions in every window of a sequence.
+
+    Input:  A sequence of hashable, comparable elements, arr, the length of the
+    windows, window, and optionally the universe of values (see
+    InversionCounter; defaults to the elements of arr).
+    Output: A generator of the number of inversions in arr[i:i+window] for
+    i = 0, 1, ..., len(arr) - window, computed incrementally with a
+    SlidingInversionCounter in O(len(arr)log(m)) time overall.
+    '''
+
+    counter = SlidingInversionCounter(arr if universe is None else universe, window)
+    for i, x in enumerate(arr):
+        counter.push(x)
+        if i >= window - 1:
+            yield counter.inversions
@@ -0,0 +1,263 @@
+# Michael D. Salerno
+
+from math import sqrt
+
+from closestPair import fastClosestPair
+from vectorized import VECTOR_CUTOFF, np
+
+NEIGHBOURS = ((0, 1), (1, -1), (1, 0), (1, 1))     #the cells after a cell, in (column, row) order; each pair of adjacent cells is visited once
+
+def gridClosestPair(points, seed = None, cutoff = VECTOR_CUTOFF):
+    '''
+    My implementation of a randomized closest pair algorithm in the style of
+    Rabin, and Khuller and Matias, which runs in expected O(n) time; no sort
+    by coordinate is needed.
+
+    Input:  A list of at least two tuples representing the x and y
+    coordinates of a set of points in R^2 (or a NumPy array of shape (n, 2)),
+    points, a seed for the random choices, seed, and the number of points at
+    or below which fastClosestPair is used instead, cutoff.
+    Output: A tuple of two tuples, the same pair of points fastClosestPair
+    (see closestPair.py) returns: of several pairs at the same distance, the
+    one whose positions (i, j), i < j, in the input come first.
+
+    Without NumPy, or for coordinates other than ints of at most 30 bits and
+    floats, fastClosestPair is used instead.
+
+    Procedure:
+        1.  Copy the coordinates into NumPy arrays, and look for coincident
+            points (see duplicateRows); if there are any, the closest pair is
+            at distance 0.
+        2.  Sieve.  Starting from all the points, S, repeat until S is empty:
+            pick a random point of S and let d be the distance to its nearest
+            neighbour in S (one vectorized pass over S).  Bucket S into a grid
+            of square cells of side d/3 (see Grid) and remove from S every
+            point with no other point of S in its own cell or the 8 cells
+            around it.  The randomly chosen point is removed, since its nearest
+            neighbour is d away, and a point that survives has a neighbour
+            within 2*sqrt(2)*d/3 < d, so d shrinks from round to round, and in
+            expectation each round removes a constant fraction of S.
+        3.  The final d is the distance between two points, so the closest
+            distance, delta, is at most d.  Also, every point was at some
+            point removed from S for having no neighbour within d'/3 >= d/3
+            among the points still in S, which included every point removed
+            after it; so delta > d/3, and a grid of cells of side d holds only
+            a few points per cell.
+        4.  Bucket all the points into a grid of cells of side d, and compare
+            every point with the later points of its own cell and with every
+            point of the 4 cells that follow it (see NEIGHBOURS).  Any pair
+            at distance <= d lies in the same or in adjacent cells, so the
+            closest pair is among them.  The pairs are compared in vectorized
+            rounds, the rth round pairing every point with the rth point of a
+            cell, until no cell has r points left.
+
+    Squared distances are compared, computed exactly as fastClosestPair
+    computes them, so that pairs at the same distance tie here as well and
+    are resolved by position in the same way.  The cells are slightly wider
+    than d, to leave room for rounding in the computation of cell indices.
+    '''
+
+    n = len(points)
+    if n < 2:
+        raise ValueError('At least two points are needed')
+
+    P = coordinates(points) if n > cutoff else None
+    if P is None:
+        return fastClosestPair(points if isinstance(points, list) else [tuple(p) for p in points])
+
+    pair = duplicateRows(P)
+    if pair is None:
+        x = P[:, 0]
+        y = P[:, 1]
+        d = sieve(x, y, np.random.default_rng(seed))
+        dist, i, j = gridSearch(x, y, d * (1 + 1e-9))
+        pair = (i, j)
+
+    if isinstance(points, list):
+        return (points[pair[0]], points[pair[1]])
+    return (tuple(points[pair[0]].tolist()), tuple(points[pair[1]].tolist()))
+
+def coordinates(points):
+    '''
+    Returns the points as a NumPy array of shape (n, 2) of 64-bit ints (if
+    every coordinate is an int of at most 30 bits, so that squared distances
+    cannot overflow) or of floats, or None if they are neither.
+    '''
+
+    P = np.asarray(points)
+    if P.ndim != 2 or P.shape[1] != 2:
+        return None
+    if P.dtype.kind in 'iu':
+        if np.abs(P).max() < 2**30:
+            return P.astype(np.int64)
+        return None
+    if P.dtype.kind == 'f' and np.isfinite(P).all():
+        return P.astype(np.float64)
+
+    return None
+
+def duplicateRows(P):
+    '''
+    Finds two coincident points.
+
+    Input:  A NumPy array of shape (n, d), P.
+    Output: The positions (i, j), i < j, of the first pair of equal rows of P
+    in the order of (i, j), or None if the rows are distinct.
+
+    The rows are sorted by (coordinates, position), so equal rows end up next
+    to each other in order of position, and the first pair of any group of
+    equal rows has the smallest i and, for that i, the smallest j.
+    '''
+
+    order = np.lexsort((np.arange(len(P)),) + tuple(P.T[::-1]))
+    S = P[order]
+    equal = np.flatnonzero((S[1:] == S[:-1]).all(axis = 1))
+    if len(equal) == 0:
+        return None
+
+    first = order[equal]
+    k = np.argmin(first)
+    return (int(first[k]), int(order[equal[k] + 1]))
+
+class Grid(object):
+    '''
+    Points bucketed into square cells of side size.
+
+    Input:  NumPy arrays of the coordinates of the points, x and y, and the
+    side of the cells, size.
+
+    Cell (c, r) holds the points with floor(x/size) = c and floor(y/size) = r,
+    and gets the key c*w + r (shifted to start at 0), where w is the number of
+    rows spanned by the points plus a margin of one on each side, so the key
+    of the cell dc columns and dr rows away is the key plus dc*w + dr.  When
+    size is so small that these keys would overflow 62 bits, the columns and
+    rows in use are replaced by their ranks instead, giving keys below n^2,
+    and neighbouring cells are looked up by binary search on the ranks.
+
+    The points are sorted by key once; the points of a cell are then a range
+    of positions in that order.
+
+    Attributes:
+        order:  the positions of the points, sorted by cell.
+        keys:  the keys of their cells, in that order.
+    '''
+
+    def __init__(self, x, y, size):
+        col = np.floor(x / size).astype(np.int64)
+        row = np.floor(y / size).astype(np.int64)
+        col -= col.min() - 1
+        row -= row.min() - 1
+
+        self.width = int(row.max()) + 2
+        if (int(col.max()) + 2) * self.width < 2**62:
+            self.cols = None
+            keys = col * self.width + row
+        else:
+            self.cols = np.unique(col)
+            self.rows = np.unique(row)
+            keys = np.searchsorted(self.cols, col) * len(self.rows) + np.searchsorted(self.rows, row)
+
+        self.order = np.argsort(keys, kind = 'stable')
+        self.keys = keys[self.order]
+        if self.cols is not None:
+            self.col = col[self.order]
+            self.row = row[self.order]
+
+        self.starts = np.concatenate(([0], np.flatnonzero(self.keys[1:] != self.keys[:-1]) + 1, [len(keys)]))
+        self.cells = self.keys[self.starts[:-1]]        #the distinct keys, in order
+
+    def cellRanges(self, dc = 0, dr = 0):
+        '''
+        For every point, in sorted order, returns the range [start, end) of
+        positions of the points in the cell dc columns and dr rows away from
+        its own (an empty range if that cell holds no points).
+        '''
+
+        if self.cols is None:
+            keys = self.keys + (dc * self.width + dr)
+            found = True
+        else:
+            col = self.col + dc
+            row = self.row + dr
+            c = np.minimum(np.searchsorted(self.cols, col), len(self.cols) - 1)
+            r = np.minimum(np.searchsorted(self.rows, row), len(self.rows) - 1)
+            found = (self.cols[c] == col) & (self.rows[r] == row)
+            keys = c * len(self.rows) + r
+
+        k = np.minimum(np.searchsorted(self.cells, keys), len(self.cells) - 1)
+        found = found & (self.cells[k] == keys)
+        start = self.starts[k]
+        end = np.where(found, self.starts[k+1], start)
+
+        return (start, end)
+
+def sieve(x, y, rng):
+    '''
+    Step 2 of gridClosestPair; returns the final distance d, for a set of at
+    least two distinct points with coordinates x and y.
+    '''
+
+    S = np.arange(len(x))
+    d = 0.0
+    while len(S) > 1:
+        k = rng.integers(len(S))
+        dx = x[S] - x[S[k]]
+        dy = y[S] - y[S[k]]
+        dist = (dx*dx + dy*dy).astype(np.float64)
+        dist[k] = np.inf
+        d = sqrt(dist.min())
+
+        grid = Grid(x[S], y[S], d / 3)
+        company = np.zeros(len(S), dtype = np.int64)     #points in the 3x3 block of cells around each point, including itself
+        for dc in (-1, 0, 1):
+            for dr in (-1, 0, 1):
+                start, end = grid.cellRanges(dc, dr)
+                company += end - start
+        S = S[grid.order[company > 1]]
+
+    return d
+
+def gridSearch(x, y, size):
+    '''
+    Step 4 of gridClosestPair; returns the smallest tuple (dist, i, j), i < j,
+    of squared distance and positions over the pairs of points in the same
+    or adjacent cells of side size.
+    '''
+
+    grid = Grid(x, y, size)
+    order = grid.order
+    sx = x[order]
+    sy = y[order]
+    p = np.arange(len(x))
+
+    same = grid.cellRanges()
+    ranges = [(p + 1, same[1])]                  #the later points of each point's own cell
+    ranges += [grid.cellRanges(dc, dr) for dc, dr in NEIGHBOURS]
+
+    best = None
+    for start, end in ranges:
+        length = end - start
+        active = np.flatnonzero(length > 0)
+        r = 0
+        while len(active):
+            q = start[active] + r
+            dx = sx[active] - sx[q]
+            dy = sy[active] - sy[q]
+            dist = dx*dx + dy*dy
+
+            m = dist.min()
+            if best is None or m <= best[0]:
+                tied = np.flatnonzero(dist == m)
+                a = order[active[tied]]
+                b = order[q[tied]]
+                i = np.minimum(a, b)
+                j = np.maximum(a, b)
+                k = np.lexsort((j, i))[0]
+                candidate = (m.item(), int(i[k]), int(j[k]))
+                if best is None or candidate < best:
+                    best = candidate
+
+            r += 1
+            active = active[length[active] > r]
+
+    return best
@@ -1,43 +1,221 @@
 # Michael D. Salerno
 
-def mergeSort(arr):
+from bisect import bisect_right
+
+from decorate import decorate, undecorate
+from vectorized import VECTOR_CUTOFF, numericArray, vectorMergeSort
+
+def mergeSort(arr, vectorCutoff = VECTOR_CUTOFF, key = None, reverse = False):
     '''
     My implementation of Merge Sort.
     
-    Input:  A list of comparable elements
+    Input:  A list of comparable elements (or a numeric array.array or NumPy
+    array), arr, the length above which numeric input is sorted with
+    vectorized merges, vectorCutoff, and, as for the built-in sorted, a
+    function computing the key to sort each element by, key, and whether to
+    sort in descending order, reverse.
     Output: The list of the elements in sorted order
     
     Merge Sort splits the input array in half and sends each subarray into a 
     recursive call.  The results of these two recursive calls, by virtue of 
     being sorted, can then merged into a complete sorted array by simultaneously 
-    iterating through each of them and, at each iteration, removing the smaller 
-    of their first elements and appending that element to the result.
+    iterating through each of them and, at each iteration, copying the smaller 
+    of their current elements to the result.
     
     At each recursion level, j, there are 2^j subproblems each of size n/(2^j); 
     this counterbalancing produces a size n problem at each level of recursion.  
     There are log2(n) levels of recursion; thus, the Merge Sort algorithm has an 
     asymptotic time complexity of O(n*logn).  This can be verified by applying
     the Master Theorem to the recurrence T(n) = 2*T(n/2) + O(n).
+
+    Rather than slicing out copies of the two halves at every level and popping
+    from the front of them (which is itself O(n) per pop), this implementation
+    allocates a single auxiliary buffer per sort and merges by index.  The
+    input and the buffer alternate roles as the source and destination of the
+    merges from one recursion level to the next, so no elements are ever copied
+    back between levels.  The input list is not modified.
+
+    When NumPy is available and arr is longer than vectorCutoff and holds only
+    ints or only floats (or is a numeric array.array or NumPy array), the
+    merges are vectorized instead (see vectorMergeSort in vectorized.py).
+
+    With a key function or reverse, the elements are decorated with their keys
+    and original positions (see decorate.py), so each key is computed once;
+    the decorated list is sorted and then undecorated.  The sort stays
+    stable, in descending order as well.
     '''
-      
-    if len(arr) <= 1:
-        return arr
-    
-    lhs = mergeSort(arr[:len(arr)/2])        #recursively sort the two halves of the input 
-    rhs = mergeSort(arr[len(arr)/2:])
-    
-    result = []
-    
-    while len(lhs) != 0 and len(rhs) != 0:  #Merge step
-        if lhs[0] <= rhs[0]:
-            result.append(lhs.pop(0))
+
+    if key is not None or reverse:
+        return undecorate(mergeSort(decorate(arr, key, reverse), vectorCutoff), reverse)
+
+    a = numericArray(arr) if len(arr) > vectorCutoff else None
+    if a is not None:
+        return vectorMergeSort(a, vectorCutoff).tolist()
+
+    result = list(arr)       #copy of the input; the sorted elements end up here
+    if len(result) <= 1:
+        return result
+
+    aux = result[:]          #the single auxiliary buffer; starts out identical to result
+
+    def sortInto(src, dst, lo, hi):
+        '''
+        Internal recursive routine.
+
+        Input:  Two lists, src and dst, holding the same elements in the range
+        [lo, hi), and the boundaries of that range.
+        Output: No output (dst[lo:hi] holds the elements in sorted order).
+
+        The halves are sorted into src, using dst as their source, and then
+        merged back into dst.  Nothing in [lo, hi) is written before the
+        recursive calls, so the two lists still agree there when a subproblem
+        of size 1 is reached.
+        '''
+
+        if hi - lo <= 1:
+            return
+
+        mid = (lo + hi) // 2
+        sortInto(dst, src, lo, mid)    #swap roles; the sorted halves land in src
+        sortInto(dst, src, mid, hi)
+        merge(src, dst, lo, mid, hi)
+
+    sortInto(aux, result, 0, len(result))
+
+    return result
+
+def merge(src, dst, lo, mid, hi):
+    '''
+    Merges the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi].
+
+    Input:  A source list, src, a destination list, dst, and the indices lo,
+    mid and hi delimiting the two adjacent sorted runs in src.
+    Output: No output (dst is written in place).
+
+    Ties are taken from the left run first, so the merge is stable.
+    '''
+
+    i = lo
+    j = mid
+    k = lo
+    while i < mid and j < hi:
+        if src[i] <= src[j]:
+            dst[k] = src[i]
+            i += 1
         else:
-            result.append(rhs.pop(0))
-            
-    if len(lhs) == 0:     #once one of the lists is exhausted, simply append the remaining list to the result
-        result += rhs
+            dst[k] = src[j]
+            j += 1
+        k += 1
+
+    if i < mid:           #once one of the runs is exhausted, copy the remainder of the other one
+        dst[k:hi] = src[i:mid]
     else:
-        result += lhs
-        
+        dst[k:hi] = src[j:hi]
+
+def bottomUpMergeSort(arr, minRun = 32, key = None, reverse = False):
+    '''
+    An iterative, bottom-up variant of Merge Sort that takes advantage of
+    order that is already present in the input.
+
+    Input:  A list of comparable elements and, optionally, the minimum length
+    of a run, minRun, a key function, key, and a descending order flag,
+    reverse, as for mergeSort.
+    Output: The list of the elements in sorted order
+
+    Rather than splitting the input in half all the way down to single
+    elements, the array is scanned once from left to right for natural runs;
+    maximal stretches that are already ascending (A[i] <= A[i+1]) or
+    descending (A[i] >= A[i+1]).  Descending runs are reversed in place, after
+    which each group of equal elements inside the run is reversed back so
+    that the sort remains stable.  Runs shorter than minRun are extended to
+    minRun elements with binary insertion sort, which is cheap on such short
+    stretches and keeps random input from producing a large number of tiny
+    runs.
+
+    Each run is pushed onto a stack of (start, length) pairs and, as in
+    TimSort, adjacent runs on top of the stack are merged whenever the
+    lengths stop decreasing quickly enough, i.e. while either of
+        len(Z) <= len(Y) + len(X)
+        len(Y) <= len(X)
+    holds for the top three runs X (top), Y and Z.  This keeps the merges
+    balanced, so the stack holds O(log(n)) runs and the total work is
+    O(nlog(n)) in the worst case.  Merges use the same index-based merge as
+    mergeSort with a single auxiliary buffer.
+
+    On input that is already sorted (or reverse sorted) there is a single run
+    and the sort finishes after one O(n) scan.  More generally, input made up
+    of r runs is sorted in O(nlog(r)) time.
+    '''
+
+    if key is not None or reverse:
+        return undecorate(bottomUpMergeSort(decorate(arr, key, reverse), minRun), reverse)
+
+    result = list(arr)
+    n = len(result)
+    if n <= 1:
+        return result
+
+    aux = [None] * n       #the single auxiliary buffer shared by every merge
+    runs = []              #stack of (start, length) pairs of pending runs
+
+    def mergeAt(i):
+        '''
+        Merges the runs at positions i and i+1 of the stack, which are
+        adjacent in result, and replaces them by the merged run.
+        '''
+        lo, leftLen = runs[i]
+        rightLen = runs[i+1][1]
+        mid = lo + leftLen
+        hi = mid + rightLen
+        aux[lo:hi] = result[lo:hi]
+        merge(aux, result, lo, mid, hi)
+        runs[i] = (lo, leftLen + rightLen)
+        del runs[i+1]
+
+    lo = 0
+    while lo < n:
+        hi = lo + 1                            #find the natural run starting at lo
+        if hi < n:
+            if result[hi] < result[lo]:        #descending; reverse it in place
+                while hi + 1 < n and result[hi+1] <= result[hi]:
+                    hi += 1
+                hi += 1
+                result[lo:hi] = result[lo:hi][::-1]
+                start = lo
+                for j in range(lo + 1, hi + 1):     #put groups of equal elements back in their original order
+                    if j == hi or result[j] != result[start]:
+                        if j - start > 1:
+                            result[start:j] = result[start:j][::-1]
+                        start = j
+            else:
+                while hi + 1 < n and result[hi+1] >= result[hi]:
+                    hi += 1
+                hi += 1
+
+        end = min(lo + minRun, n)
+        if hi < end:                           #extend a short run with binary insertion sort
+            for j in range(hi, end):
+                x = result[j]
+                i = bisect_right(result, x, lo, j)    #insert after any equal elements to stay stable
+                result[i+1:j+1] = result[i:j]
+                result[i] = x
+            hi = end
+
+        runs.append((lo, hi - lo))
+        lo = hi
+
+        while len(runs) > 1:                   #restore the run stack invariants
+            i = len(runs) - 2
+            if i > 0 and runs[i-1][1] <= runs[i][1] + runs[i+1][1]:
+                if runs[i-1][1] < runs[i+1][1]:
+                    i -= 1
+                mergeAt(i)
+            elif runs[i][1] <= runs[i+1][1]:
+                mergeAt(i)
+            else:
+                break
+
+    while len(runs) > 1:                       #collapse whatever is left on the stack
+        mergeAt(len(runs) - 2)
+
     return result
-        
\ No newline at end of file
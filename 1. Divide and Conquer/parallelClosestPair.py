@@ -0,0 +1,146 @@
+# Michael D. Salerno
+
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from math import sqrt
+from multiprocessing.sharedctypes import RawArray
+
+from closestPair import closestIndexPair, duplicatePair, fastClosestPair
+from parallelMergeSort import initWorker, sharedArrays, sharedTypecode
+
+def parallelClosestPair(points, workers = None, cutoff = 10**5):
+    '''
+    A parallel version of fastClosestPair (see closestPair.py) that solves
+    vertical slabs of the points on a pool of worker processes and then
+    resolves the pairs that cross the slab boundaries.  Called by
+    closestPair(points, workers = N).
+
+    Input:  A list of tuples representing the x and y coordinates of a set of
+    points in R^2, points, the number of worker processes, workers (defaults
+    to the number of cores), and the number of points below which
+    fastClosestPair is used instead, cutoff.
+    Output: The same pair of points fastClosestPair returns.
+
+    Inputs whose coordinates are not all ints or all floats, and runs with a
+    single worker, are handed to fastClosestPair as well.
+
+    Procedure:
+        1.  Look for coincident points (see duplicatePair); if there are any,
+            the closest pair is at distance 0.
+        2.  Sort the points by x once, and copy their x coordinates, y
+            coordinates and input positions, in that order, into shared-memory
+            arrays, handed to the workers once, when the pool starts, so no
+            points are pickled between processes.
+        3.  Split the x order into one slab of consecutive positions per
+            worker; each worker finds the closest pair of its slab with the
+            recursion of fastClosestPair (closestIndexPair).
+        4.  Let d be the smallest distance found in any slab.  A closer pair
+            must cross a boundary between two slabs, and, as in the strip of
+            closestPair, both of its points then lie within d of the first x
+            coordinate of the slab after the boundary; those points form a
+            contiguous range of positions, found by binary search.  Each
+            boundary's strip is scanned by a worker in y order, comparing
+            each point with the following ones on the other side of the
+            boundary until their vertical distance alone exceeds d.
+
+    Pairs are compared as (squared distance, i, j) tuples of their input
+    positions, with <= in the strips, exactly as in fastClosestPair, so ties
+    are resolved the same way.  With p workers, the slabs take
+    O((n/p)log(n/p)) time and the strips O(n/p) time each for points that are
+    spread out, after the O(nlog(n)) sort.
+    '''
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    n = len(points)
+    if n < 2:
+        raise ValueError('At least two points are needed')
+    typecode = sharedTypecode([c for p in points for c in p]) if n >= cutoff and workers > 1 else None
+    if typecode is None:
+        return fastClosestPair(points)
+
+    pair = duplicatePair(points)
+    if pair is not None:
+        return (points[pair[0]], points[pair[1]])
+
+    order = sorted(range(n), key = points.__getitem__)
+    xs = RawArray(typecode, [points[i][0] for i in order])
+    ys = RawArray(typecode, [points[i][1] for i in order])
+    ids = RawArray('q', order)
+
+    chunk = max(2, -(-n // workers))          #ceiling division; every slab holds at least two points
+    starts = list(range(0, n, chunk))
+    if n - starts[-1] < 2:                    #fold a lone last point into the slab before it
+        starts.pop()
+    slabs = [(lo, hi) for lo, hi in zip(starts, starts[1:] + [n])]
+
+    pool = multiprocessing.Pool(workers, initializer = initWorker, initargs = (xs, ys, ids))
+    try:
+        best = min(pool.map(solveSlab, slabs))
+
+        d = sqrt(best[0]) * (1 + 1e-12)        #rounded up, so the strips miss no pair at distance exactly d
+        xList = xs[:]
+        strips = []
+        for lo, hi in slabs[1:]:
+            left = bisect_left(xList, xList[lo] - d)
+            right = bisect_right(xList, xList[lo] + d)
+            strips.append((left, lo, right, best[0]))
+        for candidate in pool.map(scanBoundary, strips):
+            if candidate < best:
+                best = candidate
+    finally:
+        pool.close()
+        pool.join()
+
+    return (points[best[1]], points[best[2]])
+
+def solveSlab(bounds):
+    '''
+    Worker routine that returns the closest pair among the positions
+    [lo, hi), as a tuple (squared distance, i, j) of input positions.
+    '''
+
+    lo, hi = bounds
+    xs, ys, ids = sharedArrays()
+
+    return closestIndexPair(xs[lo:hi], ys[lo:hi], ids[lo:hi])
+
+def scanBoundary(task):
+    '''
+    Worker routine that scans the strip of positions [left, right) around the
+    boundary at position mid for pairs that cross it at squared distance at
+    most d2, and returns the best of them as a tuple (squared distance, i, j)
+    of input positions, or a tuple of (d2, n, n) if there are none.
+    '''
+
+    left, mid, right, d2 = task
+    xs, ys, ids = sharedArrays()
+    x = xs[left:right]
+    y = ys[left:right]
+    label = ids[left:right]
+    mid -= left
+
+    best = (d2, len(xs), len(xs))
+    strip = sorted(range(len(x)), key = y.__getitem__)
+    for s in range(len(strip) - 1):
+        p = strip[s]
+        before = p < mid
+        for t in range(s + 1, len(strip)):
+            q = strip[t]
+            dy = y[q] - y[p]
+            if dy*dy > d2:
+                break
+            if (q < mid) == before:            #does not cross the boundary
+                continue
+            dx = x[q] - x[p]
+            dist = dx*dx + dy*dy
+            if dist <= d2:
+                i = label[p]
+                j = label[q]
+                candidate = (dist, i, j) if i < j else (dist, j, i)
+                if candidate < best:
+                    best = candidate
+                    d2 = dist
+
+    return best
@@ -0,0 +1,134 @@
+# Michael D. Salerno
+
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+
+from countInversions import ENGINES, countInversions, mergeAndCount
+from parallelMergeSort import coRank, initWorker, sharedArrays, sharedTypecode
+from vectorized import VECTOR_CUTOFF
+
+def parallelCountInversions(arr, workers = None, cutoff = 10**5, returnSorted = False, vectorCutoff = VECTOR_CUTOFF,
+                            engine = None):
+    '''
+    A parallel version of countInversions that counts and sorts chunks of the
+    input on a pool of worker processes and then counts the split inversions
+    between the chunks while merging them in parallel.  Called by
+    countInversions(arr, workers = N).
+
+    Input:  A list of numbers, arr, the number of worker processes, workers
+    (defaults to the number of cores), the sequential cutoff, cutoff,
+    whether to return the sorted elements as well, returnSorted, and the
+    options vectorCutoff and engine, which are passed on to countInversions
+    for every chunk (and for inputs counted serially).
+    Output: The number of inversions in the list, or, with returnSorted, a
+    tuple (count, sortedList).  The input is not modified.
+
+    Inputs shorter than cutoff, inputs that are not made up entirely of ints
+    or entirely of floats, and runs with a single worker are handed to the
+    serial countInversions.
+
+    Procedure:
+        1.  Copy the input into a shared-memory array, along with a second
+            shared array of the same size that serves as the merge buffer, as
+            in parallelMergeSort (see parallelMergeSort.py).
+        2.  Split the array into one contiguous chunk per worker; each worker
+            counts the inversions within its chunk with the serial
+            countInversions and writes the sorted chunk back in place.
+        3.  Merge adjacent pairs of sorted runs, round by round, until one run
+            is left.  Each pairwise merge of a left run of length m is split
+            among the workers by co-ranking (see coRank).  A task producing
+            the output range [k0, k1) merges A[i0:i1] of the left run with
+            B[j0:j1] of the right run; every element of B[j0:j1] it places
+            forms a split inversion with each of the left run's elements that
+            are still unmerged at that point.  mergeAndCount counts those
+            among A[i0:i1], and each of the j1 - j0 elements also precedes
+            the m - i1 left elements beyond the task's range, so the task
+            returns mergeAndCount's count plus (j1 - j0)*(m - i1).
+
+    Co-ranking resolves ties in favour of the left run, as mergeAndCount does,
+    so equal elements are never counted, every split inversion is counted by
+    exactly one task, and the total is exactly the serial count.  The span is
+    O((n/p)log(n) + log(p)log(n)) with p workers, as for parallelMergeSort.
+    '''
+
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine: %r' % (engine,))
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    n = len(arr)
+    typecode = sharedTypecode(arr) if isinstance(arr, list) else None
+    if workers <= 1 or n < cutoff or typecode is None:
+        return countInversions(arr, returnSorted, vectorCutoff, engine)
+
+    src = RawArray(typecode, arr)
+    dst = RawArray(typecode, n)
+
+    chunk = -(-n // workers)                  #ceiling division
+    runs = [(lo, min(lo + chunk, n)) for lo in range(0, n, chunk)]
+    chunks = [(lo, hi, vectorCutoff, engine) for lo, hi in runs]
+
+    pool = multiprocessing.Pool(workers, initializer = initWorker, initargs = (src, dst))
+    try:
+        count = sum(pool.map(countChunk, chunks))
+
+        flip = 0                              #0: the runs are in src, 1: they are in dst
+        while len(runs) > 1:
+            tasks = []
+            merged = []
+            for r in range(0, len(runs), 2):
+                lo, mid = runs[r]
+                hi = runs[r+1][1] if r + 1 < len(runs) else mid    #an unpaired run is just copied across
+                size = hi - lo
+                parts = max(1, min(-(-size * workers // n), size // cutoff))
+                bounds = [size * p // parts for p in range(parts + 1)]
+                for p in range(parts):
+                    tasks.append((flip, lo, mid, hi, bounds[p], bounds[p+1]))
+                merged.append((lo, hi))
+            count += sum(pool.map(mergeCountTask, tasks))
+            runs = merged
+            flip = 1 - flip
+    finally:
+        pool.close()
+        pool.join()
+
+    if returnSorted:
+        return (count, (dst if flip else src)[:])
+
+    return count
+
+def countChunk(task):
+    '''
+    Worker routine that counts the inversions in the shared array in the
+    range [lo, hi) with the given countInversions options and sorts that
+    range in place.
+    '''
+
+    lo, hi, vectorCutoff, engine = task
+    data = sharedArrays()[0]
+    count, data[lo:hi] = countInversions(data[lo:hi], True, vectorCutoff, engine)
+
+    return count
+
+def mergeCountTask(task):
+    '''
+    Worker routine that produces the output range [lo + k0, lo + k1) of the
+    merge of the runs [lo, mid) and [mid, hi) from one shared array into the
+    other, and returns the number of split inversions formed by the elements
+    of the right run placed in that range.
+    '''
+
+    flip, lo, mid, hi, k0, k1 = task
+    src, dst = sharedArrays() if flip == 0 else sharedArrays()[::-1]
+
+    i0 = coRank(src, lo, mid, hi, k0)
+    i1 = coRank(src, lo, mid, hi, k1)
+    left = src[lo+i0:lo+i1]
+    right = src[mid+k0-i0:mid+k1-i1]
+
+    combined = left + right
+    out = [None] * len(combined)
+    count = mergeAndCount(combined, out, 0, len(left), len(combined))
+    dst[lo+k0:lo+k1] = out
+
+    return count + len(right) * (mid - lo - i1)      #left elements beyond this range follow the right ones placed here
@@ -0,0 +1,176 @@
+# Michael D. Salerno
+
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+
+from mergeSort import mergeSort, merge
+
+sharedBuffers = None       #the shared arrays handed to the pool, as seen from inside a worker process
+
+def parallelMergeSort(arr, workers = None, cutoff = 10**5):
+    '''
+    A parallel Merge Sort that sorts chunks of the input on a pool of worker
+    processes and then merges them in parallel.
+
+    Input:  A list of numbers, arr, the number of worker processes, workers
+    (defaults to the number of cores), and the sequential cutoff, cutoff.
+    Output: The list of the elements in sorted order
+
+    Inputs shorter than cutoff, inputs that are not made up entirely of ints
+    or entirely of floats, and runs with a single worker are handed to the
+    serial mergeSort; the overhead of starting processes only pays off on
+    large numeric arrays.
+
+    Procedure:
+        1.  Copy the input into a shared-memory array, along with a second
+            shared array of the same size that serves as the merge buffer.
+            Both are handed to the workers once, when the pool starts, so no
+            elements are pickled between processes.
+        2.  Split the array into one contiguous chunk per worker and sort each
+            chunk in place with mergeSort (see mergeSort.py).
+        3.  Merge adjacent pairs of sorted runs, round by round, alternating
+            the shared arrays as source and destination, until one run is
+            left.  Each pairwise merge is itself split among the workers by
+            co-ranking: for an output position k, a binary search finds the
+            unique split (i, j), i + j = k, such that the first k merged
+            elements are the first i elements of the left run and the first j
+            of the right run.  Output ranges [k0, k1) can then be merged
+            independently from A[i0:i1] and B[j0:j1].
+
+    With p workers, sorting the chunks takes O((n/p)log(n/p)) time and each
+    of the log(p) merge rounds takes O(n/p + log(n)) time, for a total of
+    O((n/p)log(n) + log(p)log(n)) span.
+    '''
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    n = len(arr)
+    typecode = sharedTypecode(arr)
+    if workers <= 1 or n < cutoff or typecode is None:
+        return mergeSort(arr)
+
+    src = RawArray(typecode, arr)
+    dst = RawArray(typecode, n)
+
+    chunk = -(-n // workers)                  #ceiling division
+    runs = [(lo, min(lo + chunk, n)) for lo in range(0, n, chunk)]
+
+    pool = multiprocessing.Pool(workers, initializer = initWorker, initargs = (src, dst))
+    try:
+        pool.map(sortChunk, runs)
+
+        flip = 0                              #0: the runs are in src, 1: they are in dst
+        while len(runs) > 1:
+            tasks = []
+            merged = []
+            for r in range(0, len(runs), 2):
+                lo, mid = runs[r]
+                hi = runs[r+1][1] if r + 1 < len(runs) else mid    #an unpaired run is just copied across
+                size = hi - lo
+                parts = max(1, min(-(-size * workers // n), size // cutoff))
+                bounds = [size * p // parts for p in range(parts + 1)]
+                for p in range(parts):
+                    tasks.append((flip, lo, mid, hi, bounds[p], bounds[p+1]))
+                merged.append((lo, hi))
+            pool.map(mergeTask, tasks)
+            runs = merged
+            flip = 1 - flip
+    finally:
+        pool.close()
+        pool.join()
+
+    return (dst if flip else src)[:]
+
+def sharedTypecode(arr):
+    '''
+    Picks an array typecode able to hold every element of arr exactly.
+
+    Input:  A list.
+    Output: 'q' for 64-bit integers, 'd' for floats, or None if the elements
+    cannot be stored in a shared numeric array.
+    '''
+
+    if len(arr) == 0:
+        return None
+    if all(type(x) is int for x in arr):
+        if -2**63 <= min(arr) and max(arr) < 2**63:
+            return 'q'
+        return None
+    if all(type(x) is float for x in arr):
+        return 'd'
+
+    return None
+
+def initWorker(*arrays):
+    '''
+    Pool initializer shared by the parallel modules; stores the shared arrays
+    in the worker's globals, where sharedArrays finds them.
+    '''
+
+    global sharedBuffers
+    sharedBuffers = arrays
+
+def sharedArrays():
+    '''
+    Returns the tuple of shared arrays the pool was started with, from inside
+    a worker process.
+    '''
+
+    return sharedBuffers
+
+def sortChunk(bounds):
+    '''
+    Worker routine that sorts the shared array in the range [lo, hi) in place.
+    '''
+
+    lo, hi = bounds
+    data = sharedBuffers[0]
+    data[lo:hi] = mergeSort(data[lo:hi])
+
+def coRank(A, lo, mid, hi, k):
+    '''
+    Finds how many elements of the left run take part in the first k elements
+    of a stable merge.
+
+    Input:  An array, A, containing the sorted runs A[lo:mid] and A[mid:hi],
+    and an output rank, k, with 0 <= k <= hi - lo.
+    Output: The number of elements, i, of the left run among the first k
+    merged elements.  The remaining k - i come from the right run.
+
+    Ties are resolved in favour of the left run, consistent with merge.
+    '''
+
+    m = mid - lo
+    n = hi - mid
+    low = max(0, k - n)
+    high = min(k, m)
+    while True:
+        i = (low + high) // 2
+        j = k - i
+        if i > 0 and j < n and A[lo+i-1] > A[mid+j]:       #too many elements from the left run
+            high = i - 1
+        elif j > 0 and i < m and A[mid+j-1] >= A[lo+i]:    #too few elements from the left run
+            low = i + 1
+        else:
+            return i
+
+def mergeTask(task):
+    '''
+    Worker routine that produces the output range [lo + k0, lo + k1) of the
+    merge of the runs [lo, mid) and [mid, hi) from one shared array into the
+    other.
+    '''
+
+    flip, lo, mid, hi, k0, k1 = task
+    src, dst = sharedBuffers if flip == 0 else sharedBuffers[::-1]
+
+    i0 = coRank(src, lo, mid, hi, k0)
+    i1 = coRank(src, lo, mid, hi, k1)
+    left = src[lo+i0:lo+i1]
+    right = src[mid+k0-i0:mid+k1-i1]
+
+    combined = left + right
+    out = [None] * len(combined)
+    merge(combined, out, 0, len(left), len(combined))
+    dst[lo+k0:lo+k1] = out
@@ -0,0 +1,175 @@
+# Michael D. Salerno
+
+import multiprocessing
+import random
+import timeit
+
+from quickSort import quickSort
+from cop_out_quickSort import cop_out_quickSort
+from pivot_strategies import quickSortEngine, dualPivotEngine, FirstElement, LastElement, MedianOfThree, Ninther
+from radixSort import countingSort, radixSort
+from random_pivot import RandomPivot, PrefetchedRandomPivot
+
+def bestTime(f, data, repeat = 3):
+    '''
+    Times f on a fresh copy of data and returns the best of several runs.
+
+    Input:  A function taking a single list, f, the list to pass to it, data,
+    and the number of runs, repeat.
+    Output: The smallest wall-clock time observed, in seconds.
+    '''
+
+    best = float('inf')
+    for r in range(repeat):
+        arr = list(data)
+        start = timeit.default_timer()
+        f(arr)
+        best = min(best, timeit.default_timer() - start)
+
+    return best
+
+def listChoicePivot(A, left, right):
+    '''
+    The pivot draw quickSort used to make; builds the list of candidate
+    indices on every call.  Kept here as the benchmark baseline.
+    '''
+
+    return random.choice(list(range(left, right)))
+
+def benchmarkPivotSources(n = 10**5, repeat = 3, seed = 0):
+    '''
+    Compares the cost of drawing random pivots by building a list of the
+    candidate indices with that of RandomPivot and PrefetchedRandomPivot,
+    both per draw and as part of a full quickSort of n random integers, and
+    prints the results as a table.
+
+    Output: A dictionary mapping each pivot source's name to a tuple
+    (microseconds per draw over a range of n indices, quickSort time).
+    '''
+
+    rng = random.Random(seed)
+    data = [rng.randint(1, n) for i in range(n)]
+
+    sources = [('list + choice', listChoicePivot, max(1, 10**6 // n)),    #O(n) per draw; keep the number of draws small
+               ('RandomPivot', RandomPivot(seed), 10**5),
+               ('Prefetched', PrefetchedRandomPivot(seed), 10**5)]
+
+    results = {}
+    print('%-15s %14s %12s' % ('pivot source', 'us/draw (n)', 'quickSort'))
+    for name, pivot, draws in sources:
+        start = timeit.default_timer()
+        for i in range(draws):
+            pivot(data, 0, n)
+        perDraw = (timeit.default_timer() - start) / draws * 10**6
+        sortTime = bestTime(lambda arr: quickSort(arr, pivot = pivot), data, repeat)
+        results[name] = (perDraw, sortTime)
+        print('%-15s %14.3f %11.4fs' % (name, perDraw, sortTime))
+
+    return results
+
+def loadTestData(filename = 'quicksort_test_data.txt'):
+    '''
+    Reads a file with one integer per line into a list.
+    '''
+
+    with open(filename) as f:
+        return [int(line) for line in f if line.strip()]
+
+def benchmarkDualPivot(sizes = (10**5, 10**6), repeat = 1, seed = 0):
+    '''
+    Compares dual-pivot partitioning with the single-pivot strategies of
+    pivot_strategies.py on quicksort_test_data.txt and on random integers of
+    each of the given sizes.  For every strategy, the comparisons and swaps
+    counted by the engine and the wall time of the corresponding
+    uninstrumented quickSort (pure Python path) are printed.
+
+    Output: A dictionary mapping (dataset, strategy) to a tuple
+    (comparisons including those made choosing pivots, swaps, quickSort time).
+    '''
+
+    rng = random.Random(seed)
+    datasets = [('test data', loadTestData())]
+    for n in sizes:
+        datasets.append(('random %d' % n, [rng.randint(1, n) for i in range(n)]))
+
+    strategies = [('first', FirstElement, False),
+                  ('last', LastElement, False),
+                  ('median of 3', MedianOfThree, False),
+                  ('ninther', Ninther, False),
+                  ('random', lambda: RandomPivot(seed), False),
+                  ('dual random', lambda: RandomPivot(seed), True)]
+
+    results = {}
+    print('%-15s %-12s %12s %12s %12s' % ('input', 'strategy', 'comparisons', 'swaps', 'quickSort'))
+    for dataName, data in datasets:
+        for name, strategy, dual in strategies:
+            engine = dualPivotEngine if dual else quickSortEngine
+            stats = engine(list(data), strategy())
+            comparisons = stats.comparisons + stats.pivotComparisons
+            sortTime = bestTime(lambda arr: quickSort(arr, pivot = strategy(), vectorCutoff = len(arr), dualPivot = dual), data, repeat)
+            results[(dataName, name)] = (comparisons, stats.swaps, sortTime)
+            print('%-15s %-12s %12d %12d %11.4fs' % (dataName, name, comparisons, stats.swaps, sortTime))
+
+    return results
+
+def benchmarkParallelQuickSort(n = 10**7, maxWorkers = None, repeat = 1, seed = 0):
+    '''
+    Measures the speedup of quickSort(A, workers = w) over the serial
+    quickSort on n random integers for 2, 3, ..., maxWorkers worker processes
+    (defaults to the number of cores) and prints the results as a table.
+
+    Output: A dictionary mapping each number of workers to its wall time; the
+    serial time is stored under 1.
+    '''
+
+    if maxWorkers is None:
+        maxWorkers = multiprocessing.cpu_count()
+
+    rng = random.Random(seed)
+    data = [rng.randint(1, n) for i in range(n)]
+
+    results = {1: bestTime(quickSort, data, repeat)}
+    print('%-8s %12s %9s' % ('workers', 'time', 'speedup'))
+    print('%-8d %11.4fs %8.2fx' % (1, results[1], 1.0))
+    for w in range(2, maxWorkers + 1):
+        results[w] = bestTime(lambda arr: quickSort(arr, workers = w), data, repeat)
+        print('%-8d %11.4fs %8.2fx' % (w, results[w], results[1] / results[w]))
+
+    return results
+
+def benchmarkIntegerSort(n = 10**5, repeat = 3, seed = 0):
+    '''
+    Compares quickSort on its comparison paths with countingSort, radixSort,
+    and quickSort with the integer fast path (radix = True), on
+    quicksort_test_data.txt and on n random integers spanning n, 2^20 and
+    2^32 values.  Prints the results as a table.
+
+    Output: A dictionary mapping (dataset, sorter) to its wall time.
+    '''
+
+    rng = random.Random(seed)
+    datasets = [('test data', loadTestData())]
+    for span in (n, 2**20, 2**32):
+        datasets.append(('span %d' % span, [rng.randrange(span) for i in range(n)]))
+
+    sorters = [('quickSort', quickSort),
+               ('countingSort', countingSort),
+               ('radixSort', radixSort),
+               ('quickSort (radix)', lambda arr: quickSort(arr, radix = True))]
+
+    results = {}
+    print('%-18s %-18s %12s' % ('input', 'sorter', 'time'))
+    for dataName, data in datasets:
+        for name, sort in sorters:
+            if name == 'countingSort' and max(data) - min(data) > 16 * len(data):
+                continue                 #the count array alone would dwarf the input
+            results[(dataName, name)] = bestTime(sort, data, repeat)
+            print('%-18s %-18s %11.4fs' % (dataName, name, results[(dataName, name)]))
+
+    return results
+
+if __name__ == '__main__':
+    benchmarkPivotSources()
+    benchmarkDualPivot()
+    benchmarkParallelQuickSort()
+    benchmarkIntegerSort()
@@ -1,6 +1,9 @@
 # Michael D. Salerno
 
-def cop_out_quickSort(A):
+from decorate import decorate, undecorate
+from random_pivot import randomPivot
+
+def cop_out_quickSort(A, pivot = randomPivot, key = None, reverse = False):
     '''
     Another Quick Sort implementation of mine.  This version is a cop out in the
     sense that it does not take advantage of the in-place sorting that Quick
@@ -11,19 +14,24 @@ def cop_out_quickSort(A):
     
     For more details and analysis of the Quick Sort algorithm, see my 
     documentation for quickSort.py.
+
+    As with quickSort, a key function, key, and a descending order flag,
+    reverse, may be given; the elements are then decorated with their keys
+    once up front (see decorate.py) and the result is stable.
     '''
-    
-    import random
+
+    if key is not None or reverse:
+        return undecorate(cop_out_quickSort(decorate(A, key, reverse), pivot), reverse)
     
     if len(A) == 0:
         return A
     
-    p = random.choice(list(range(len(A))))     #randomized selection of pivot index
+    p = pivot(A, 0, len(A))              #randomized selection of pivot index; see random_pivot.py
     
     ALeft = []                           #initialize ALeft which will contain the <p partition
     ARight = []                          #initialize ARight which will contain the >p partition
     switchFlag = False
-    for j in range(1, len(A)):           #iterate through the array
+    for j in range(len(A)):              #iterate through the array
         if j == p:                       #skip comparing the pivot to itself
             continue
         if A[j] == A[p]:                 #this if block properly distributes duplicate pivot values between ALeft and ARight
@@ -39,7 +47,7 @@ def cop_out_quickSort(A):
             ARight.append(A[j])
             
     
-    lhs = cop_out_quickSort(ALeft)       #recurse on copies of the <p and >p partitions; sort and return them recursively
-    rhs = cop_out_quickSort(ARight)             
+    lhs = cop_out_quickSort(ALeft, pivot) #recurse on copies of the <p and >p partitions; sort and return them recursively
+    rhs = cop_out_quickSort(ARight, pivot)
 
     return lhs + [A[p]] + rhs            #prepend and append the sorted <p and >p partitions, respectively, to the pivot
\ No newline at end of file
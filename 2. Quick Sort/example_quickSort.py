@@ -1,6 +1,9 @@
 # Michael D. Salerno
 
-def example_quickSort(A):
+from decorate import decorate, undecorate
+from random_pivot import randomPivot
+
+def example_quickSort(A, pivot = randomPivot, key = None, reverse = False):
     '''
     Another Quick Sort implementation of mine.  This one is mostly for 
     demonstrative purposes.  It uses the in-place partitioning algorithm 
@@ -14,14 +17,19 @@ def example_quickSort(A):
     
     See my documentation for quickSort.py for more details and analysis on
     the Quick Sort algorithm.
+
+    As with quickSort, a key function, key, and a descending order flag,
+    reverse, may be given; the elements are then decorated with their keys
+    once up front (see decorate.py) and the result is stable.
     '''
-    
-    import random
+
+    if key is not None or reverse:
+        return undecorate(example_quickSort(decorate(A, key, reverse), pivot), reverse)
     
     if len(A) == 0:
         return A
     
-    p = random.choice(list(range(len(A))))     #randomized selection of pivot index
+    p = pivot(A, 0, len(A))              #randomized selection of pivot index; see random_pivot.py
 
     A[0], A[p] = A[p], A[0]              #swap the pivot into the first position
 
@@ -34,7 +42,7 @@ def example_quickSort(A):
                 
     A[0], A[i] = A[i], A[0]              #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
     
-    lhs = example_quickSort(A[:i])               #recurse on copies of the <p and >p partitions; sort and return them recursively
-    rhs = example_quickSort(A[i+1:])             #avoid including the pivot in the recursion
+    lhs = example_quickSort(A[:i], pivot)        #recurse on copies of the <p and >p partitions; sort and return them recursively
+    rhs = example_quickSort(A[i+1:], pivot)      #avoid including the pivot in the recursion
 
     return lhs + [A[i]] + rhs           #prepend and append the sorted <p and >p partitions, respectively, to the pivot
\ No newline at end of file
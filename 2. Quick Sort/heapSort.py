@@ -0,0 +1,44 @@
+# Michael D. Salerno
+
+from heap import Heap
+
+class SubarrayHeap(Heap):
+    '''
+    A heap over a copy of a subarray.  Unlike the heaps in heap.py, it does not
+    maintain the element -> position index, so the elements need not be
+    hashable or distinct.  It is only suitable for sorting (no delete(x)).
+    '''
+    def swap_indices(self, i, j):
+        self.elements[i], self.elements[j] = self.elements[j], self.elements[i]
+    def heapify(self, key, max_heap = False):
+        for i in range(len(self.elements) // 2, 0, -1):    #leaves are already heaps
+            self.bubble_down(i, key, max_heap)
+
+
+def heapSort(A, left = 0, right = None):
+    '''
+    My implementation of Heap Sort, used by quickSort as its fallback when the
+    recursion gets too deep.
+
+    Input:  A list of comparable elements, A, and optionally the boundaries,
+    left and right, of the portion of A to sort (right is one past the last
+    index, defaulting to len(A)).
+    Output: No output (A[left:right] is sorted in place).
+
+    The elements are heapified into a max-heap in O(n) time.  The maximum is
+    then repeatedly extracted and written to the rightmost unfilled position,
+    which costs O(log(n)) per element, for O(nlog(n)) time in the worst case
+    regardless of the input.
+    '''
+
+    if right is None:
+        right = len(A)
+    if right - left <= 1:
+        return
+
+    h = SubarrayHeap(list(A[left:right]), max_heap = True)      #a list copy; slicing a NumPy array would give a view
+
+    for k in range(right - 1, left - 1, -1):
+        h.swap_indices(0, h.size() - 1)       #move the maximum to the end of the heap and detach it
+        A[k] = h.elements.pop()
+        h.bubble_down(1, h.key, True)
@@ -0,0 +1,165 @@
+# Michael D. Salerno
+
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from partition import threeWayPartition
+from quickSort import quickSort
+from random_pivot import randomPivot
+from vectorized import VECTOR_CUTOFF, np, vectorPartition, vectorQuickSort
+
+sharedState = None       #(shared array, NumPy view of it or None, options for quickSort, grain), as seen from inside a worker process
+
+def parallelQuickSort(A, workers = None, threshold = 16, pivot = randomPivot, vectorCutoff = VECTOR_CUTOFF,
+                      dualPivot = False, radix = False, cutoff = 10**5, grain = None):
+    '''
+    A parallel Quick Sort in which partitioning steps are tasks run by a pool
+    of worker processes.  Called by quickSort(A, workers = N).
+
+    Input:  A list of numbers, A, the number of worker processes, workers
+    (defaults to the number of cores), the options threshold, pivot,
+    vectorCutoff, dualPivot and radix, which are passed on to quickSort, the
+    input length below which the serial quickSort is used instead, cutoff,
+    and the subarray length at or below which a worker finishes a subarray
+    itself rather than handing it back to the pool, grain (defaults to
+    n/(4*workers)).
+    Output: No output (the list is sorted in place).
+
+    Lists that are not made up entirely of ints or entirely of floats, and
+    inputs other than lists, are sorted by the serial quickSort.
+
+    Procedure:
+        1.  Copy A into a shared-memory array, handed to the workers once when
+            the pool starts, so no elements are pickled between processes.
+        2.  Submit the whole array as the first task.  A task partitions its
+            subarray with threeWayPartition, or, when NumPy is available,
+            with vectorPartition directly on the shared memory.  Each resulting
+            partition of length <= grain is sorted right away by the same
+            worker with the serial quickSort (or vectorQuickSort); the bounds
+            of larger partitions are returned to the parent.
+        3.  The parent submits every returned partition as a new task, until
+            no tasks are outstanding, and copies the array back into A.
+
+    The first partitioning step runs on one worker, the next on up to two,
+    and so on; after about log2(p) levels all p workers are busy.  The span is
+    therefore dominated by the O(n) top-level partition, plus O((n/p)log(n))
+    for the rest of the work on average.  Every task writes only to its own
+    subarray, so no locking is needed.  The tasks always split with a single
+    pivot; dualPivot only affects the sorts of the small partitions.
+
+    With the default pivot source, each worker reseeds its copy from the
+    system, so that forked workers do not all draw the same pivots.  Any
+    other pivot source is copied into each worker as it is, and since the
+    order in which tasks run varies, a seeded source does not make the
+    sequence of pivots reproducible.
+    '''
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    n = len(A)
+    typecode = sharedTypecode(A) if isinstance(A, list) else None
+    if workers <= 1 or n < cutoff or typecode is None:
+        quickSort(A, threshold, pivot, vectorCutoff, dualPivot, radix = radix)
+        return
+
+    if grain is None:
+        grain = max(threshold, n // (4 * workers))
+
+    data = RawArray(typecode, A)
+    options = (threshold, pivot if pivot is not randomPivot else None, vectorCutoff, dualPivot, radix)
+    done = Queue()
+
+    pool = multiprocessing.Pool(workers, initializer = initWorker, initargs = (data, typecode, options, grain))
+    try:
+        pool.apply_async(sortTask, ((0, n),), callback = done.put, error_callback = done.put)
+        outstanding = 1
+        while outstanding:
+            result = done.get()
+            outstanding -= 1
+            if isinstance(result, BaseException):
+                raise result
+            for bounds in result:
+                pool.apply_async(sortTask, (bounds,), callback = done.put, error_callback = done.put)
+                outstanding += 1
+    finally:
+        pool.close()
+        pool.join()
+
+    A[:] = data[:]
+
+def sharedTypecode(A):
+    '''
+    Picks an array typecode able to hold every element of A exactly.
+
+    Input:  A list.
+    Output: 'q' for 64-bit integers, 'd' for floats, or None if the elements
+    cannot be stored in a shared numeric array.
+    '''
+
+    if len(A) == 0:
+        return None
+    if all(type(x) is int for x in A):
+        if -2**63 <= min(A) and max(A) < 2**63:
+            return 'q'
+        return None
+    if all(type(x) is float for x in A):
+        return 'd'
+
+    return None
+
+def initWorker(data, typecode, options, grain):
+    '''
+    Pool initializer; stores the shared array, a NumPy view of it (None
+    without NumPy, or in dual-pivot mode, which has no vectorized path), and
+    the sort parameters in the worker's globals.  A pivot source of None
+    stands for the default one, which is reseeded here.
+    '''
+
+    global sharedState
+    threshold, pivot, vectorCutoff, dualPivot, radix = options
+    if pivot is None:
+        pivot = randomPivot
+        pivot.rng.seed()
+    view = np.frombuffer(data, dtype = typecode) if np is not None and not dualPivot else None
+    sharedState = (data, view, (threshold, pivot, vectorCutoff, dualPivot, radix), grain)
+
+def sortTask(bounds):
+    '''
+    Worker routine that partitions the shared array in the range
+    [left, right), sorts the partitions no longer than grain, and returns the
+    bounds of the remaining partitions.
+    '''
+
+    data, view, options, grain = sharedState
+    threshold, pivot, vectorCutoff, dualPivot, radix = options
+    left, right = bounds
+
+    m = right - left
+    local = view is None or m <= vectorCutoff
+    if local:
+        seg = data[left:right]             #work on a local copy of the range; it is written back before returning
+        lt, gt = threeWayPartition(seg, 0, m, pivot(seg, 0, m))
+    else:
+        seg = view[left:right]             #sorted directly in shared memory
+        lt, gt = vectorPartition(seg, 0, m, pivot(seg, 0, m))
+
+    remaining = []
+    for l, r in ((0, lt), (gt, m)):
+        if r - l <= grain:
+            if local:
+                part = seg[l:r]
+                quickSort(part, threshold, pivot, vectorCutoff, dualPivot, radix = radix)
+                seg[l:r] = part
+            else:
+                vectorQuickSort(seg[l:r], pivot, vectorCutoff)
+        else:
+            remaining.append((left + l, left + r))
+
+    if local:
+        data[left:right] = seg
+    return remaining
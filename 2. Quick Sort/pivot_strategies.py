@@ -1,5 +1,301 @@
 # Michael D. Salerno
 
+from decorate import decorate, undecorate
+from partition import threeWayPartition, dualPivotPartition
+from random_pivot import randomPivot
+
+
+class PivotStrategy(object):
+    '''
+    Base class of the deterministic pivot selection strategies.
+
+    A pivot strategy is called as pivot(A, left, right) and returns the index
+    of the chosen pivot, left <= p < right, just like the pivot sources in
+    random_pivot.py, so any of them can be handed to quickSortEngine (or to
+    quickSort and rSelect).  The comparisons between elements made while
+    choosing pivots are counted in self.comparisons.
+    '''
+    def __init__(self):
+        self.comparisons = 0
+    def less(self, x, y):
+        self.comparisons += 1
+        return x < y
+    def median3(self, A, i, j, k):
+        '''
+        Returns whichever of the indices i, j and k holds the median of the
+        three elements, using two or three comparisons.
+        '''
+        less = self.less
+        if less(A[i], A[j]):
+            if less(A[j], A[k]):
+                return j
+            return k if less(A[i], A[k]) else i
+        else:
+            if less(A[i], A[k]):
+                return i
+            return k if less(A[j], A[k]) else j
+
+
+class FirstElement(PivotStrategy):
+    '''
+    Always chooses the first element of the subarray.  Quadratic on input that
+    is already sorted.
+    '''
+    def __call__(self, A, left, right):
+        return left
+
+
+class LastElement(PivotStrategy):
+    '''
+    Always chooses the last element of the subarray.  Quadratic on input that
+    is already sorted.
+    '''
+    def __call__(self, A, left, right):
+        return right - 1
+
+
+class MedianOfThree(PivotStrategy):
+    '''
+    Chooses the median of the first, middle and last elements of the subarray.
+    For a subarray of even length 2k, the middle element is the kth one.
+    '''
+    def __call__(self, A, left, right):
+        mid = left + (right - left - 1) // 2
+        return self.median3(A, left, mid, right - 1)
+
+
+class Ninther(PivotStrategy):
+    '''
+    Tukey's ninther; the median of the medians of three evenly spaced triples
+    of elements.  It approximates the median of the subarray much more closely
+    than median-of-three at the cost of at most 12 comparisons.  Subarrays
+    shorter than cutoff fall back to median-of-three.
+    '''
+    def __init__(self, cutoff = 40):
+        super(Ninther, self).__init__()
+        self.cutoff = cutoff
+    def __call__(self, A, left, right):
+        n = right - left
+        mid = left + (n - 1) // 2
+        if n < self.cutoff:
+            return self.median3(A, left, mid, right - 1)
+        step = n // 8
+        last = right - 1
+        return self.median3(A, self.median3(A, left, left + step, left + 2*step),
+                               self.median3(A, mid - step, mid, mid + step),
+                               self.median3(A, last - 2*step, last - step, last))
+
+
+class MedianOfMedians(PivotStrategy):
+    '''
+    The median of medians pivot rule from the deterministic selection
+    algorithm (see dSelect.py in 4. Linear-Time Selection); the subarray is
+    split into groups of five, and the exact median of the groups' medians is
+    chosen by recursive selection.  Every partition is then at worst a 30-70
+    split, which guarantees O(nlog(n)) Quick Sort, but choosing each pivot
+    costs O(m) comparisons of its own.
+    '''
+    def __call__(self, A, left, right):
+        return self.select(A, list(range(left, right)), (right - left - 1) // 2)
+    def select(self, A, indices, k):
+        '''
+        Returns the index, out of the list of indices, of the element of rank
+        k among A[indices].  Works on the index list only; A is not modified.
+        '''
+        less = self.less
+        while True:
+            if len(indices) <= 5:
+                return self.sortGroup(A, indices)[k]
+
+            medians = []
+            for g in range(0, len(indices), 5):
+                group = self.sortGroup(A, indices[g:g+5])
+                medians.append(group[(len(group) - 1) // 2])
+            p = self.select(A, medians, (len(medians) - 1) // 2)
+
+            pivot = A[p]
+            lower = [i for i in indices if less(A[i], pivot)]
+            upper = [i for i in indices if less(pivot, A[i])]
+            if k < len(lower):
+                indices = lower
+            elif k >= len(indices) - len(upper):
+                k -= len(indices) - len(upper)
+                indices = upper
+            else:
+                return p
+    def sortGroup(self, A, group):
+        '''
+        Insertion sort of a short list of indices by the elements they hold.
+        '''
+        for j in range(1, len(group)):
+            x = group[j]
+            i = j - 1
+            while i >= 0 and self.less(A[x], A[group[i]]):
+                group[i+1] = group[i]
+                i -= 1
+            group[i+1] = x
+        return group
+
+
+class QuickSortStats(object):
+    '''
+    Counters collected by quickSortEngine over one run.
+
+    comparisons:  element comparisons made by the partitioning procedure
+    pivotComparisons:  element comparisons made by the pivot strategy
+    estimate:  the sum of m - 1 over every partitioned subarray of length m;
+        the count returned by the quickSort_* functions below
+    swaps:  swaps (and rotations) made by the partitioning procedure
+    partitions:  the number of partitioning steps
+    maxDepth:  the deepest level of the recursion tree at which a subarray
+        was partitioned, counting the top-level call as depth 1
+    imbalance:  a histogram of how lopsided the partitions were; maps the
+        share of the subarray that went to the smaller side, rounded down to a
+        multiple of 5%, to the number of partitions with that share.  Under
+        this measure 25-75 splits or better land in buckets 25 through 50.
+        For dual-pivot partitions, the smallest of the three parts is used,
+        so even splits land in bucket 30.
+    '''
+    def __init__(self):
+        self.comparisons = 0
+        self.pivotComparisons = 0
+        self.estimate = 0
+        self.swaps = 0
+        self.partitions = 0
+        self.maxDepth = 0
+        self.imbalance = {}
+    def __str__(self):
+        histogram = ', '.join('%d%%: %d' % (b, self.imbalance[b]) for b in sorted(self.imbalance))
+        return ('comparisons: %d (+%d choosing pivots, estimate %d), swaps: %d, '
+                'partitions: %d, max depth: %d, imbalance: {%s}') % \
+               (self.comparisons, self.pivotComparisons, self.estimate, self.swaps,
+                self.partitions, self.maxDepth, histogram)
+
+
+def quickSortEngine(A, pivot = randomPivot, key = None, reverse = False):
+    '''
+    My implementation of the Quick Sort algorithm with in-place sorting, a
+    pluggable pivot selection strategy, and instrumentation for comparing
+    strategies on real workloads.
+
+    Input:  A list of comparable elements, A, and a pivot strategy, pivot;
+    FirstElement(), LastElement(), MedianOfThree(), Ninther(),
+    MedianOfMedians(), or a random pivot source such as RandomPivot(seed)
+    (defaults to the shared random pivot source), and optionally a key
+    function, key, and a descending order flag, reverse, as for quickSort.
+    Output: A QuickSortStats object with the counters for this run.
+    Note:  The list is sorted in place.
+
+    The partitioning procedure is the three-way partition shared with
+    quickSort.py (see partition.py).  Unlike quickSort, no insertion sort or
+    Heap Sort fallback is used, so that the counters reflect the pivot
+    strategy alone.  The smaller partition is still the one sorted by a
+    recursive call, so the stack stays shallow even when the recursion tree
+    does not.
+
+    With a key or reverse, the strategies see the decorated elements (see
+    decorate.py), which compare by key, so every strategy chooses its pivots
+    by key without computing any key more than once.
+    '''
+
+    if key is not None or reverse:
+        D = decorate(A, key, reverse)
+        stats = quickSortEngine(D, pivot)
+        A[:] = undecorate(D, reverse)
+        return stats
+
+    stats = QuickSortStats()
+    before = getattr(pivot, 'comparisons', 0)
+
+    def qSort(A, left, right, depth):
+        '''
+        Internal routine containing the implementation of Quick Sort.
+
+        Input:  A list, A, indices, left and right, indicating the
+        boundaries of the partition to be processed (right is one past its
+        last index), and the depth of this call in the recursion tree.
+        The loop on the larger partition stands in for a recursive call, so it
+        moves one level deeper as well.
+        Output: No output (the list is sorted in place).
+        '''
+
+        while right - left > 1:
+            m = right - left
+            stats.estimate += m - 1
+            stats.partitions += 1
+            stats.maxDepth = max(stats.maxDepth, depth)
+
+            lt, gt = threeWayPartition(A, left, right, pivot(A, left, right), stats)
+
+            bucket = 5 * (20 * min(lt - left, right - gt) // m)
+            stats.imbalance[bucket] = stats.imbalance.get(bucket, 0) + 1
+
+            depth += 1
+            if lt - left < right - gt:
+                qSort(A, left, lt, depth)
+                left = gt
+            else:
+                qSort(A, gt, right, depth)
+                right = lt
+
+    qSort(A, 0, len(A), 1)
+    stats.pivotComparisons = getattr(pivot, 'comparisons', 0) - before
+
+    return stats
+
+def dualPivotEngine(A, pivot = randomPivot, key = None, reverse = False):
+    '''
+    The dual-pivot counterpart of quickSortEngine, with the same input and
+    output.  Each step chooses two pivots by calling the pivot strategy twice
+    (the second time on the subarray without the first pivot's position) and
+    partitions with dualPivotPartition (see partition.py), so its counters can
+    be compared directly with those of the single-pivot strategies.
+    '''
+
+    if key is not None or reverse:
+        D = decorate(A, key, reverse)
+        stats = dualPivotEngine(D, pivot)
+        A[:] = undecorate(D, reverse)
+        return stats
+
+    stats = QuickSortStats()
+    before = getattr(pivot, 'comparisons', 0)
+
+    def dpqSort(A, left, right, depth):
+        '''
+        Internal routine containing the implementation of dual-pivot Quick
+        Sort; same input and output as qSort in quickSortEngine.
+        '''
+
+        while right - left > 1:
+            m = right - left
+            stats.estimate += m - 1
+            stats.partitions += 1
+            stats.maxDepth = max(stats.maxDepth, depth)
+
+            p = pivot(A, left, right)
+            q = pivot(A, left, right - 1)
+            if q >= p:
+                q += 1
+            lp, gp = dualPivotPartition(A, left, right, p, q, stats)
+
+            parts = [(left, lp), (gp+1, right)]
+            if A[lp] < A[gp]:
+                parts.append((lp+1, gp))
+            smallest = min(r - l for l, r in parts) if len(parts) == 3 else 0
+            bucket = 5 * (20 * smallest // m)
+            stats.imbalance[bucket] = stats.imbalance.get(bucket, 0) + 1
+
+            parts.sort(key = lambda part: part[1] - part[0])
+            depth += 1
+            for l, r in parts[:-1]:
+                dpqSort(A, l, r, depth)
+            left, right = parts[-1]
+
+    dpqSort(A, 0, len(A), 1)
+    stats.pivotComparisons = getattr(pivot, 'comparisons', 0) - before
+
+    return stats
 
 def quickSort_first_element(A):
     '''
@@ -16,52 +312,11 @@ def quickSort_first_element(A):
     Output: The number of comparisons made by the quicksort algorithm.
     Note:  The list is sorted in place.  The number of comparisons made by the
     quicksort algorithm is returned in order to analyze its running time given
-    this strategy for choosing pivots.
+    this strategy for choosing pivots.  Use quickSortEngine(A, FirstElement())
+    for the full set of counters.
     '''
-    def qSort(A, left, right):
-        '''
-        Internal routine containing the implementation of Quick Sort.
-
-        Input:  A list, A, and indices, left and right,  indicating the
-        boundaries of the partition to be processed.  Note that the right-most
-        index of the list, A, is (right - 1).  "right" is passed a value that
-        is one greater than the maximum index of A.  On the initial call, it is
-        passed the length of array A.
-        Output: The number of comparisons made in this call to the partitioning
-        procedure.
-        '''
-
-        if left == right:
-            return 0
-
-        p = left    #always chooses the first element as the pivot
-
-        A[left], A[p] = A[p], A[left]
 
-        switchFlag = False                      ##flag to be used to handle duplicate pivot values
-        i = left                                #initialize pointer to shadow the division between the <p and >p partitions
-        for j in range(left+1, right):         #j is a pointer to the next unexamined element; it separates the <p and >p partitions from the unexamined partition
-            if A[j] == A[left]:                ##check if the next unexamined value is equal to the pivot; if this happens more than once, there are some number of duplicate pivot values
-                if not switchFlag:
-                    switchFlag = True          ##alternating switchFlag ensures that duplicate pivot values are split evenly
-                else:
-                    i += 1
-                    if i != j:
-                        A[i], A[j] = A[j], A[i]
-                    switchFlag = False
-
-            elif A[j] < A[left]:
-                i += 1                          #increment i so that it points at the left-most element of the >p partition
-                if i != j:                      #this check avoids redundant swaps which would occur if an element greater than the pivot hasn't been found yet
-                    A[i], A[j] = A[j], A[i]     #after this swap, i points at the right-most element of the <p partition that was just swapped in
-
-        A[left], A[i] = A[i], A[left]           #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
-
-        #recurse on the array itself; uses pointers to the <p and >p partitions to sort in place
-        #recursively aggregate the number of comparisons being made
-        return (right - left - 1) + qSort(A, left, i) + qSort(A, i+1, right)
-
-    return qSort(A, 0, len(A))                        #call to qSort with initial boundary pointers; sorts the list in place
+    return quickSortEngine(A, FirstElement()).estimate
 
 def quickSort_last_element(A):
     '''
@@ -78,52 +333,11 @@ def quickSort_last_element(A):
     Output: The number of comparisons made by the quicksort algorithm.
     Note:  The list is sorted in place.  The number of comparisons made by the
     quicksort algorithm is returned in order to analyze its running time given
-    this strategy for choosing pivots.
+    this strategy for choosing pivots.  Use quickSortEngine(A, LastElement())
+    for the full set of counters.
     '''
-    def qSort(A, left, right):
-        '''
-        Internal routine containing the implementation of Quick Sort.
-
-        Input:  A list, A, and indices, left and right,  indicating the
-        boundaries of the partition to be processed.  Note that the right-most
-        index of the list, A, is (right - 1).  "right" is passed a value that
-        is one greater than the maximum index of A.  On the initial call, it is
-        passed the length of array A.
-        Output: The number of comparisons made in this call to the partitioning
-        procedure.
-        '''
-
-        if left == right:
-            return 0
-
-        p = right - 1                           # always chooses the last element as the pivot
-
-        A[left], A[p] = A[p], A[left]           #swap the pivot into the first position
-
-        switchFlag = False                      ##flag to be used to handle duplicate pivot values
-        i = left                                #initialize pointer to shadow the division between the <p and >p partitions
-        for j in range(left+1, right):         #j is a pointer to the next unexamined element; it separates the <p and >p partitions from the unexamined partition
-            if A[j] == A[left]:                ##check if the next unexamined value is equal to the pivot; if this happens more than once, there are some number of duplicate pivot values
-                if not switchFlag:
-                    switchFlag = True          ##alternating switchFlag ensures that duplicate pivot values are split evenly
-                else:
-                    i += 1
-                    if i != j:
-                        A[i], A[j] = A[j], A[i]
-                    switchFlag = False
 
-            elif A[j] < A[left]:
-                i += 1                          #increment i so that it points at the left-most element of the >p partition
-                if i != j:                      #this check avoids redundant swaps which would occur if an element greater than the pivot hasn't been found yet
-                    A[i], A[j] = A[j], A[i]     #after this swap, i points at the right-most element of the <p partition that was just swapped in
-
-        A[left], A[i] = A[i], A[left]           #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
-
-        #recurse on the array itself; uses pointers to the <p and >p partitions to sort in place
-        #recursively aggregate the number of comparisons being made
-        return (right - left - 1) + qSort(A, left, i) + qSort(A, i+1, right)
-
-    return qSort(A, 0, len(A))                        #call to qSort with initial boundary pointers; sorts the list in place
+    return quickSortEngine(A, LastElement()).estimate
 
 def quickSort_median_of_three(A):
     '''
@@ -141,63 +355,8 @@ def quickSort_median_of_three(A):
     Output: The number of comparisons made by the quicksort algorithm.
     Note:  The list is sorted in place.  The number of comparisons made by the
     quicksort algorithm is returned in order to analyze its running time given
-    this strategy for choosing pivots.
+    this strategy for choosing pivots.  Use quickSortEngine(A, MedianOfThree())
+    for the full set of counters.
     '''
-    def qSort(A, left, right):
-        '''
-        Internal routine containing the implementation of Quick Sort.
 
-        Input:  A list, A, and indices, left and right,  indicating the
-        boundaries of the partition to be processed.  Note that the right-most
-        index of the list, A, is (right - 1).  "right" is passed a value that
-        is one greater than the maximum index of A.  On the initial call, it is
-        passed the length of array A.
-        Output: The number of comparisons made in this call to the partitioning
-        procedure.
-        '''
-        import math
-
-        if left == right:
-            return 0
-
-        #compute the middle index for this array
-        length = right - left
-        if length % 2 == 0:
-            mid = left + int(length/2 - 1)               #result is an integer, but python coerces to float.  Need int for indexing.
-        else:
-            mid = math.floor(left + length/2)
-
-        #point the pivot to the "median of three"
-        if A[left] <= A[mid] <= A[right-1] or A[left] >= A[mid] >= A[right-1]:
-            p = mid
-        elif A[mid] <= A[left] <= A[right-1] or A[mid] >= A[left] >= A[right-1]:
-            p = left
-        else:
-            p = right-1
-
-        A[left], A[p] = A[p], A[left]           #swap the pivot into the first position
-
-        switchFlag = False                      ##flag to be used to handle duplicate pivot values
-        i = left                                #initialize pointer to shadow the division between the <p and >p partitions
-        for j in range(left+1, right):         #j is a pointer to the next unexamined element; it separates the <p and >p partitions from the unexamined partition
-            if A[j] == A[left]:                ##check if the next unexamined value is equal to the pivot; if this happens more than once, there are some number of duplicate pivot values
-                if not switchFlag:
-                    switchFlag = True          ##alternating switchFlag ensures that duplicate pivot values are split evenly
-                else:
-                    i += 1
-                    if i != j:
-                        A[i], A[j] = A[j], A[i]
-                    switchFlag = False
-
-            elif A[j] < A[left]:
-                i += 1                          #increment i so that it points at the left-most element of the >p partition
-                if i != j:                      #this check avoids redundant swaps which would occur if an element greater than the pivot hasn't been found yet
-                    A[i], A[j] = A[j], A[i]     #after this swap, i points at the right-most element of the <p partition that was just swapped in
-
-        A[left], A[i] = A[i], A[left]           #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
-
-        #recurse on the array itself; uses pointers to the <p and >p partitions to sort in place
-        #recursively aggregate the number of comparisons being made
-        return (right - left - 1) + qSort(A, left, i) + qSort(A, i+1, right)
-
-    return qSort(A, 0, len(A))                        #call to qSort with initial boundary pointers; sorts the list in place
+    return quickSortEngine(A, MedianOfThree()).estimate
@@ -1,12 +1,32 @@
 # Michael D. Salerno
 
+import math
 
-def quickSort(A):
+from decorate import decorate, undecorate
+from heapSort import heapSort
+from partition import threeWayPartition, dualPivotPartition
+from radixSort import integerSort
+from random_pivot import randomPivot
+from vectorized import VECTOR_CUTOFF, numericArray, vectorQuickSort
+
+
+def quickSort(A, threshold = 16, pivot = randomPivot, vectorCutoff = VECTOR_CUTOFF, dualPivot = False,
+              workers = 1, key = None, reverse = False, radix = False):
     '''
     My implementation of the Quick Sort algorithm with randomized pivot
     selection and in-place sorting.
 
-    Input:  A list of comparable elements
+    Input:  A list of comparable elements (or a numeric array.array or NumPy
+    array), A, the subarray length at or below which insertion sort takes
+    over, threshold, optionally the pivot source, pivot (see random_pivot.py;
+    pass RandomPivot(seed) for a reproducible run), the length above which
+    numeric input is sorted with vectorized partitioning, vectorCutoff,
+    whether to use dual-pivot partitioning instead, dualPivot, the number
+    of worker processes to sort with, workers, and, as for the built-in
+    sorted, a function computing the key to sort each element by, key,
+    whether to sort in descending order, reverse, and whether lists of ints
+    may be sorted without comparisons, radix (off by default, so that the
+    pivot source is always used).
     Output: No output
     Note:  It is not necessary to return the sorted list in this implementation
     because the list is sorted in place.
@@ -35,6 +55,10 @@ def quickSort(A):
         the right-most element of the <p partition (A[i] at the end of
         partitioning).  This is the pivot's correct sorted position in A.
 
+    Elements equal to the pivot are gathered into a third, ==p, partition next
+    to the pivot (see partition.py).  They are already in their final sorted
+    positions, so input with many duplicate keys does not keep comparing them.
+
     Once the array is properly partitioned, the <p and >p partitions are
     sent into recursive calls to Quick Sort.  This implementation uses minimal
     memory by sorting in-place; thus, the recursive calls do not need to return
@@ -125,52 +149,172 @@ def quickSort(A):
 
         QED!
 
+    Hybrid (Introsort) safeguards:
+    The theorem above bounds the average, but an unlucky (or adversarial)
+    sequence of pivots still makes Quick Sort quadratic with O(n) recursion
+    depth.  This implementation therefore:
+
+        - Stops partitioning subarrays of length <= threshold and finishes them
+          with insertion sort, which has much lower overhead on short inputs.
+        - Tracks the partitioning depth and, once it exceeds 2*log2(n), sorts
+          the remaining subarray with Heap Sort (see heapSort.py).  This caps
+          the worst-case running time at O(nlog(n)).
+        - Recurses only on the smaller partition and loops on the larger one.
+          The smaller side is at most half of the subarray, so the stack depth
+          never exceeds log2(n).
+
+    Numeric fast path:
+    When NumPy is available and A is longer than vectorCutoff and holds only
+    ints or only floats (or is a numeric array.array or NumPy array), the
+    element-by-element partitioning loop is replaced by vectorized partitioning
+    with boolean masks, and subarrays of length <= vectorCutoff are finished
+    by NumPy's sort (see vectorized.py).  The result is written back into A,
+    so the sort still happens in place on the caller's list or buffer.
+
+    Integer fast path:
+    With radix set, a list of ints is first handed to integerSort
+    (see radixSort.py), which sorts it by counting sort when its keys span at
+    most a few values per element and by LSD radix sort when they span at most
+    2^32 values, and leaves wider ranges to the algorithm above.  Neither
+    compares elements, so their O(n + k) and O(n) running times beat the
+    O(nlog(n)) of Quick Sort on bounded integer keys such as IDs.
+
+    Dual-pivot mode:
+    With dualPivot set, each step picks two pivots, P1 <= P2, and partitions
+    the subarray into three parts, <P1, P1..P2 and >P2, using Yaroslavskiy's
+    procedure (see dualPivotPartition in partition.py).  This makes fewer
+    comparisons and swaps than single-pivot partitioning on large random
+    arrays.  The insertion sort, Heap Sort and smaller-side recursion
+    safeguards apply as above; the two smaller parts are sorted recursively
+    and the largest by the loop.  The integer and numeric fast paths are not
+    used in this mode.
+
+    Parallel mode:
+    With workers > 1, a large list of ints or floats is sorted by a pool of
+    worker processes sharing one copy of the array (see parallel_quickSort.py).
+    Each partitioning step is a task; partitions above a size threshold become
+    new tasks for the pool, while smaller ones are finished by the worker that
+    produced them with the serial algorithm above.
+
+    Keys:
+    With a key function or reverse, A is decorated with the keys and original
+    positions (see decorate.py), the decorated list is sorted, and A is
+    overwritten with the undecorated result.  Each key is computed once, and
+    elements with equal keys keep their original order.  The decorated
+    tuples are not numeric, so the numeric fast path and parallel mode are
+    not used.
+
     '''
 
-    def qSort(A, left, right):
+    if key is not None or reverse:
+        D = decorate(A, key, reverse)
+        quickSort(D, threshold, pivot, vectorCutoff, dualPivot)
+        A[:] = undecorate(D, reverse)
+        return
+
+    if workers > 1:
+        from parallel_quickSort import parallelQuickSort     #imported here because parallel_quickSort imports this module
+        parallelQuickSort(A, workers, threshold, pivot, vectorCutoff, dualPivot, radix)
+        return
+
+    result = integerSort(A) if radix and not dualPivot and len(A) > threshold else None
+    if result is not None:
+        A[:] = result
+        return
+
+    a = numericArray(A) if len(A) > vectorCutoff and not dualPivot else None
+    if a is not None:
+        vectorQuickSort(a, pivot, vectorCutoff)
+        if isinstance(A, list):                #a is a copy of a list; array.array and NumPy input were sorted directly
+            A[:] = a.tolist()
+        return
+
+    n = len(A)
+    depthLimit = 2 * int(math.log(n, 2)) if n > 1 else 0
+
+    def qSort(A, left, right, depth):
         '''
         Internal routine containing the implementation of Quick Sort.
 
-        Input:  A list, A, and indices, left and right,  indicating the
-        boundaries of the partition to be processed.  Note that the right-most
-        index of the list, A, is (right - 1).  "right" is passed a value that
-        is one greater than the maximum index of A.  On the initial call, it is
-        passed the length of array A.
+        Input:  A list, A, indices, left and right,  indicating the
+        boundaries of the partition to be processed, and the number of
+        partitioning levels still allowed before switching to Heap Sort, depth.
+        Note that the right-most index of the list, A, is (right - 1).  "right"
+        is passed a value that is one greater than the maximum index of A.  On
+        the initial call, it is passed the length of array A.
         Output: No output (the list is sorted in place).
 
         The wrapper function, quickSort, calls this function with the
         appropriate initialization parameters.
+
+        Only the smaller of the two partitions is sorted by a recursive call;
+        the larger one is handled by the next iteration of the loop.
         '''
 
-        import random
+        while right - left > threshold:
+            if depth == 0:                      #too many bad pivots; finish this subarray in O(mlog(m)) worst-case time
+                heapSort(A, left, right)
+                return
+            depth -= 1
+
+            p = pivot(A, left, right)               #randomized selection of pivot index
 
-        if left == right:
-            return A
+            lt, gt = threeWayPartition(A, left, right, p)     #A[lt:gt] holds the pivot and its duplicates, already in their final positions
 
-        p = random.choice(list(range(left, right)))    #randomized selection of pivot index
+            if lt - left < right - gt:             #recurse on the smaller partition, loop on the larger one; the stack never exceeds log2(n) frames
+                qSort(A, left, lt, depth)
+                left = gt
+            else:
+                qSort(A, gt, right, depth)
+                right = lt
 
-        A[left], A[p] = A[p], A[left]           #swap the pivot into the first position
+        insertionSort(A, left, right)          #small subarrays are finished off by insertion sort
 
-        switchFlag = False                      ##flag to be used to handle duplicate pivot values
-        i = left                                #initialize pointer to shadow the division between the <p and >p partitions
-        for j in range(left+1, right):         #j is a pointer to the next unexamined element; it separates the <p and >p partitions from the unexamined partition
-            if A[j] == A[left]:                ##check if the next unexamined value is equal to the pivot; if this happens more than once, there are some number of duplicate pivot values
-                if not switchFlag:
-                    switchFlag = True          ##alternating switchFlag ensures that duplicate pivot values are split evenly
-                else:
-                    i += 1
-                    if i != j:
-                        A[i], A[j] = A[j], A[i]
-                    switchFlag = False
+    def dualPivotQSort(A, left, right, depth):
+        '''
+        Internal routine containing the dual-pivot variant of qSort; same
+        input and output as qSort.
+        '''
 
-            elif A[j] < A[left]:
-                i += 1                          #increment i so that it points at the left-most element of the >p partition
-                if i != j:                      #this check avoids redundant swaps which would occur if an element greater than the pivot hasn't been found yet
-                    A[i], A[j] = A[j], A[i]     #after this swap, i points at the right-most element of the <p partition that was just swapped in
+        while right - left > max(threshold, 1):   #dual-pivot partitioning needs at least two elements
+            if depth == 0:
+                heapSort(A, left, right)
+                return
+            depth -= 1
 
-        A[left], A[i] = A[i], A[left]           #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
+            p = pivot(A, left, right)               #two distinct pivot indices
+            q = pivot(A, left, right - 1)
+            if q >= p:
+                q += 1
 
-        qSort(A, left, i)                      #recurse on the array itself; uses pointers to the <p and >p partitions to sort in place so no return is necessary
-        qSort(A, i+1, right)                   #avoid including the pivot in the recursion
+            lp, gp = dualPivotPartition(A, left, right, p, q)
+
+            parts = [(left, lp), (gp+1, right)]
+            if A[lp] < A[gp]:                       #if the pivots are equal, the middle part holds only their duplicates
+                parts.append((lp+1, gp))
+            parts.sort(key = lambda part: part[1] - part[0])
+
+            for l, r in parts[:-1]:                 #recurse on the smaller parts, loop on the largest one
+                dualPivotQSort(A, l, r, depth)
+            left, right = parts[-1]
+
+        insertionSort(A, left, right)
+
+    if dualPivot:
+        dualPivotQSort(A, 0, n, depthLimit)
+    else:
+        qSort(A, 0, n, depthLimit)             #call to qSort with initial boundary pointers; sorts the list in place
+
+def insertionSort(A, left, right):
+    '''
+    Sorts A[left:right] in place by insertion sort.  O(m^2) in the worst case,
+    but faster than partitioning for the short subarrays quickSort hands it.
+    '''
 
-    qSort(A, 0, len(A))                        #call to qSort with initial boundary pointers; sorts the list in place
+    for j in range(left+1, right):
+        x = A[j]
+        i = j - 1
+        while i >= left and A[i] > x:
+            A[i+1] = A[i]
+            i -= 1
+        A[i+1] = x
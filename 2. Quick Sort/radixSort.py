@@ -0,0 +1,156 @@
+# Michael D. Salerno
+
+from array import array
+
+from vectorized import VECTOR_CUTOFF, np
+
+COUNTING_FACTOR = 4     #counting sort is used when the keys span at most this many values per element
+RADIX_BITS = 8          #narrowest digit used by the pure Python radix sort; long inputs use digits of up to 16 bits
+MAX_KEY_BITS = 32       #integerSort leaves keys spanning a wider range to the comparison sorts
+
+def integerSort(A):
+    '''
+    Sorts a list of integers without comparing elements, picking counting
+    sort or LSD radix sort from the range of the keys.
+
+    Input:  A list, A.
+    Output: A new list of the elements of A in sorted order, or None if A is
+    not a list of at least two ints, or if its keys span more than
+    2^MAX_KEY_BITS values.
+
+    With n elements spanning k = max - min + 1 values:
+        - k <= COUNTING_FACTOR*n:  counting sort, O(n + k).
+        - k <= 2^MAX_KEY_BITS:  LSD radix sort, in as few passes over the
+          data as digits of at most max(RADIX_BITS, min(16, log2(n))) bits
+          allow; two or three passes for long inputs.
+        - Wider ranges need more passes than an O(nlog(n)) comparison sort
+          would, so None is returned and the caller sorts as usual.
+    Both run on NumPy arrays when NumPy is available and the list is longer
+    than VECTOR_CUTOFF (see vectorized.py).
+
+    quicksort_test_data.txt, for example, holds 10000 distinct keys in the
+    range 1..10000 and is sorted by a single counting pass.
+    '''
+
+    if not isinstance(A, list) or len(A) < 2 or not all(type(x) is int for x in A):
+        return None
+
+    lo = min(A)
+    hi = max(A)
+    if hi - lo < COUNTING_FACTOR * len(A):
+        return countingSort(A, lo, hi)
+    if (hi - lo).bit_length() <= MAX_KEY_BITS:
+        return radixSort(A, lo, hi)
+
+    return None
+
+def countingSort(A, lo = None, hi = None):
+    '''
+    Counting sort of a list of integers.
+
+    Input:  A list of ints, A, and optionally its minimum and maximum, lo and
+    hi, if already known.
+    Output: A new list of the elements of A in sorted order.
+
+    The occurrences of each value are tallied in an array of hi - lo + 1
+    machine integers, which is then read out in order; O(n + k) time and O(k)
+    extra memory for k = hi - lo + 1.
+    '''
+
+    if len(A) == 0:
+        return []
+    if lo is None:
+        lo = min(A)
+    if hi is None:
+        hi = max(A)
+
+    if vectorizable(A, lo, hi):
+        counts = np.bincount(np.array(A, dtype = np.int64) - lo, minlength = hi - lo + 1)
+        return np.repeat(np.arange(lo, hi + 1, dtype = np.int64), counts).tolist()
+
+    counts = array('l', [0]) * (hi - lo + 1)
+    for x in A:
+        counts[x - lo] += 1
+
+    result = []
+    for v, c in enumerate(counts):
+        if c:
+            result += [v + lo] * c
+
+    return result
+
+def radixSort(A, lo = None, hi = None, bits = None):
+    '''
+    Least significant digit radix sort of a list of integers.
+
+    Input:  A list of ints, A, optionally its minimum and maximum, lo and hi,
+    if already known, and the number of bits per digit, bits.  The keys must
+    span fewer than 2^63 values.  By default, the keys are split into the
+    fewest digits of at most max(RADIX_BITS, min(16, log2(n))) bits, with the
+    bits spread evenly over the digits; a pass costs O(n + 2^bits), so wider
+    digits only pay off on longer inputs.
+    Output: A new list of the elements of A in sorted order.
+
+    The keys are shifted to offsets x - lo >= 0, stored in an array of 64-bit
+    integers, and sorted by one stable counting pass per digit, from the
+    least significant digit to the most significant one.  Each pass tallies
+    the digits in an array of 2^bits counts, turns the tallies into starting
+    positions, and scatters the offsets into a second array of the same size;
+    the two arrays then swap roles.  Since every pass is stable, the order
+    established by the lower digits survives among equal higher digits.
+    Keys spanning b bits take ceil(b/bits) passes of O(n + 2^bits) time.
+
+    The NumPy version uses 16-bit digits, for which NumPy's stable argsort is
+    itself a radix sort.
+    '''
+
+    n = len(A)
+    if n == 0:
+        return []
+    if lo is None:
+        lo = min(A)
+    if hi is None:
+        hi = max(A)
+    width = (hi - lo).bit_length()
+
+    if vectorizable(A, lo, hi):
+        base = np.uint64(lo % 2**64)            #offsets are computed modulo 2^64, so they never overflow
+        offsets = np.array(A, dtype = np.int64).astype(np.uint64) - base
+        for shift in range(0, width, 16):
+            digits = ((offsets >> np.uint64(shift)) & np.uint64(0xFFFF)).astype(np.uint16)
+            offsets = offsets[np.argsort(digits, kind = 'stable')]
+        return (offsets + base).view(np.int64).tolist()
+
+    if bits is None:
+        widest = max(RADIX_BITS, min(16, n.bit_length()))
+        passes = max(1, -(-width // widest))
+        bits = max(1, -(-width // passes))
+    mask = (1 << bits) - 1
+    src = array('q', [x - lo for x in A])
+    dst = array('q', [0]) * n
+    for shift in range(0, width, bits):
+        counts = array('l', [0]) * (mask + 1)
+        for x in src:
+            counts[(x >> shift) & mask] += 1
+
+        total = 0
+        for d in range(mask + 1):               #turn the tallies into the starting position of each digit
+            c = counts[d]
+            counts[d] = total
+            total += c
+
+        for x in src:
+            d = (x >> shift) & mask
+            dst[counts[d]] = x
+            counts[d] += 1
+        src, dst = dst, src
+
+    return [x + lo for x in src]
+
+def vectorizable(A, lo, hi):
+    '''
+    Whether the integer list A, with minimum lo and maximum hi, is worth
+    sorting with NumPy and fits in 64-bit integers.
+    '''
+
+    return np is not None and len(A) > VECTOR_CUTOFF and -2**63 <= lo and hi < 2**63
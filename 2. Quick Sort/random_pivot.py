@@ -0,0 +1,45 @@
+# Michael D. Salerno
+
+import random
+
+class RandomPivot(object):
+    '''
+    A source of uniformly random pivot indices for Quick Sort and Randomized
+    Selection.
+
+    A pivot source is called as pivot(A, left, right) and returns an index p
+    with left <= p < right.  Each draw takes O(1) time and memory; the
+    index is computed directly from a uniform float instead of choosing from a
+    freshly built list of the candidate indices.
+
+    Passing a seed makes the sequence of pivots, and therefore the number of
+    comparisons and the running time, reproducible.  Alternatively, any object
+    with a random() method returning floats in [0, 1), such as a
+    random.Random instance, can be supplied as rng.
+    '''
+    def __init__(self, seed = None, rng = None):
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.random = self.rng.random
+    def __call__(self, A, left, right):
+        return left + int(self.random() * (right - left))
+
+
+class PrefetchedRandomPivot(RandomPivot):
+    '''
+    A RandomPivot that draws its uniform floats from the generator in batches
+    of batchSize, so the generator is only consulted once per batch.  The
+    sequence of pivots is still fully determined by the seed (or rng) and the
+    batch size.
+    '''
+    def __init__(self, seed = None, rng = None, batchSize = 1024):
+        super(PrefetchedRandomPivot, self).__init__(seed, rng)
+        self.batchSize = batchSize
+        self.buffer = []
+    def __call__(self, A, left, right):
+        if not self.buffer:
+            r = self.random
+            self.buffer = [r() for i in range(self.batchSize)]
+        return left + int(self.buffer.pop() * (right - left))
+
+
+randomPivot = RandomPivot()     #shared default pivot source, seeded from the system
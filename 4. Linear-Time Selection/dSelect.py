@@ -1,5 +1,7 @@
 # Michael D. Salerno
 
+from partition import threeWayPartition
+
 def dSelect(A, k):
     '''
     My implementation of an O(n) deterministic selection algorithm.
@@ -25,9 +27,10 @@ def dSelect(A, k):
         3.  Copy n/5 medians (i.e., middle element of each sorted group) into
             new array C
         4.  Recursively compute the median of C and return this as the pivot
-        5.  Partition A around the pivot.  (Let i = final index of the pivot)
-        6.  If i > k, return a recursion on the left side of the array
-        7.  If i < k, return a recursion on the right side of the array
+        5.  Partition A around the pivot into <p, ==p and >p partitions (see
+            partition.py).  (Let [lt, gt) = final indices of the ==p partition)
+        6.  If k < lt, return a recursion on the left side of the array
+        7.  If k >= gt, return a recursion on the right side of the array
         
     Another key difference between rSelect and dSelect is that the dSelect
     algorithm uses 2 recursive calls instead of 1.
@@ -114,37 +117,18 @@ def dSelect(A, k):
         
         C = medians(groups)                     #find the medians of each group
         
-        pivot = deterministicSelection(C, len(C), n/10)  #select the median of medians as the pivot; len(C) is either n/5 or n/5 + 1
+        pivot = deterministicSelection(C, len(C), n//10)  #select the median of medians as the pivot; len(C) is either n/5 or n/5 + 1
         p = A.index(pivot)                      #save the pivot's index
 
-        A[0], A[p] = A[p], A[0]                 #swap the pivot into the first position
-        
-        switchFlag = False                      ##flag to be used to handle duplicate pivot values
-        i = 0                                   #initialize pointer to shadow the division between the <p and >p partitions
-        for j in range(1, len(A)):             #j is a pointer to the next unexamined element; it separates the <p and >p partitions from the unexamined partition
-            if A[j] == A[0]:                   ##check if the next unexamined value is equal to the pivot; of this happens more than once, there are some number of duplicate pivot values
-                if not switchFlag:
-                    switchFlag = True          ##alternating switchFlag ensures that duplicate pivot values are split evenly
-                else:
-                    i += 1
-                    if i != j:
-                        A[i], A[j] = A[j], A[i]
-                    switchFlag = False
-                    
-            elif A[j] < A[0]:
-                i += 1                          #increment i so that it points at the left-most element of the >p partition
-                if i != j:                      #this check avoids redundant swaps which would occur if an element greater than the pivot hasn't been found yet
-                    A[i], A[j] = A[j], A[i]     #after this swap, i points at the right-most element of the <p partition that was just swapped in
-
-        A[0], A[i] = A[i], A[0]                 #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
+        lt, gt = threeWayPartition(A, 0, n, p)  #A[lt:gt] holds the pivot and its duplicates, already in their final positions
         
-        if i == k:                            #check if the pivot is the kth order statistic
-            return A[i]
+        if lt <= k < gt:                      #check if the pivot (or one of its duplicates) is the kth order statistic
+            return A[lt]
         
-        elif i > k:                           #if the pivot is greater than the kth order element, recurse on a copy of the left side of the array and adjust the size parameter
-            return deterministicSelection(A[:i], i, k)
+        elif k < lt:                          #if the pivot is greater than the kth order element, recurse on a copy of the left side of the array and adjust the size parameter
+            return deterministicSelection(A[:lt], lt, k)
         else:                                 #if the pivot is smaller than the kth order element, recurse on a copy the right side of the array and adjust the size and order parameters
-            return deterministicSelection(A[i+1:], n-(i+1), k-(i+1))
+            return deterministicSelection(A[gt:], n-gt, k-gt)
         
     return deterministicSelection(A[:], len(A), k-1)  #k-1 is passed here in order to offset to 1-based indexing from Python's native 0-based indexing
                                                       #a copy of A is passed in order to prevent the original list from being modified 
@@ -177,29 +161,51 @@ def groupsOfFive(A):
 def mergeSort(arr):
     '''
     My implementation of Merge Sort.  For analysis see my documentation of
+    mergeSort.py.  Merges by index using a single auxiliary buffer whose role
+    alternates with the result's between recursion levels.
+    '''
+
+    result = list(arr)
+    if len(result) <= 1:
+        return result
+
+    aux = result[:]
+
+    def sortInto(src, dst, lo, hi):
+        if hi - lo <= 1:
+            return
+
+        mid = (lo + hi) // 2
+        sortInto(dst, src, lo, mid)
+        sortInto(dst, src, mid, hi)
+        merge(src, dst, lo, mid, hi)
+
+    sortInto(aux, result, 0, len(result))
+
+    return result
+
+def merge(src, dst, lo, mid, hi):
+    '''
+    Merges the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi].  See
     mergeSort.py.
     '''
-      
-    if len(arr) <= 1:
-        return arr
-    
-    lhs = mergeSort(arr[:len(arr)/2])
-    rhs = mergeSort(arr[len(arr)/2:])
-    
-    result = []
-    
-    while len(lhs) != 0 and len(rhs) != 0:
-        if lhs[0] <= rhs[0]:
-            result.append(lhs.pop(0))
+
+    i = lo
+    j = mid
+    k = lo
+    while i < mid and j < hi:
+        if src[i] <= src[j]:
+            dst[k] = src[i]
+            i += 1
         else:
-            result.append(rhs.pop(0))
-            
-    if len(lhs) == 0:
-        result += rhs
+            dst[k] = src[j]
+            j += 1
+        k += 1
+
+    if i < mid:
+        dst[k:hi] = src[i:mid]
     else:
-        result += lhs
-        
-    return result
+        dst[k:hi] = src[j:hi]
     
 def medians(groups):
     '''
@@ -212,8 +218,8 @@ def medians(groups):
     result = []
     for g in groups:
         if len(g) %2 == 0:
-            result.append(g[len(g)/2 - 1])  #if the given array is even in length, identify the first of the two middle indices as the middle index
+            result.append(g[len(g)//2 - 1])  #if the given array is even in length, identify the first of the two middle indices as the middle index
         else:
-            result.append(g[len(g)/2])
+            result.append(g[len(g)//2])
             
     return result
\ No newline at end of file
@@ -0,0 +1,169 @@
+# Michael D. Salerno
+
+def threeWayPartition(A, left, right, p, stats = None):
+    '''
+    Partitions A[left:right] in place around the pivot A[p] into elements less
+    than, equal to, and greater than the pivot.  Shared by the Quick Sort and
+    selection implementations.
+
+    Input:  A list, A, indices, left and right, indicating the boundaries of
+    the partition to be processed (right is one past the last index), the
+    index of the pivot, p, with left <= p < right, and optionally an object
+    with integer attributes comparisons and swaps, stats, which are
+    incremented by the work done here.
+    Output: A tuple (lt, gt) such that
+        A[left:lt]  < pivot
+        A[lt:gt]   == pivot
+        A[gt:right] > pivot
+    The block A[lt:gt] is in its final sorted position, so callers only need
+    to recurse on A[left:lt] and A[gt:right].
+
+    This is the partitioning procedure described in quickSort.py, extended
+    with a third region for duplicates of the pivot.  The pivot is swapped into
+    the first position, and as the pointer j scans from left to right A looks
+    like this:
+
+        [pivot | <p | ==p | >p | unexamined]
+                 i    e    j
+
+    where i is the right-most element of the <p region and e the right-most
+    element of the ==p region.  An element less than the pivot is rotated into
+    the <p region (the first ==p element moves to the end of the ==p region
+    and the first >p element moves to position j), an element equal to the
+    pivot is swapped to the end of the ==p region, and a greater element stays
+    where it is.  Finally the pivot is swapped with the right-most element of
+    the <p region, which puts it next to its duplicates.
+
+    When the elements are distinct, the ==p region is always empty and the
+    procedure performs exactly the same swaps as the two-way partition.  With
+    many duplicates, every copy of the pivot is excluded from the recursion,
+    so an array with only a few distinct keys is sorted in O(n) time per
+    distinct key instead of being compared over and over again.
+
+    Each element other than the pivot is compared to it once if it is smaller
+    and twice otherwise.  A swap or three-element rotation counts as one swap.
+    '''
+
+    A[left], A[p] = A[p], A[left]         #swap the pivot into the first position
+    pivot = A[left]
+
+    swaps = 0
+    i = left                              #right-most element of the <p region
+    e = left                              #right-most element of the ==p region
+    for j in range(left+1, right):        #j is a pointer to the next unexamined element
+        x = A[j]
+        if x < pivot:
+            i += 1
+            e += 1
+            if i != j:                    #rotate x into the <p region; avoids redundant swaps if no >p element has been found yet
+                A[j] = A[e]
+                A[e] = A[i]
+                A[i] = x
+                swaps += 1
+        elif x == pivot:
+            e += 1
+            if e != j:
+                A[j] = A[e]
+                A[e] = x
+                swaps += 1
+
+    A[left], A[i] = A[i], A[left]         #swap the pivot with the right-most element of the <p region; it now heads the ==p region
+
+    if stats is not None:
+        stats.comparisons += 2 * (right - left - 1) - (i - left)
+        stats.swaps += swaps + (p != left) + (i != left)
+
+    return (i, e + 1)
+
+def dualPivotPartition(A, left, right, p, q, stats = None):
+    '''
+    Yaroslavskiy's dual-pivot partitioning procedure (the one used by Java's
+    Arrays.sort for primitives).  Partitions A[left:right] in place around
+    two pivots, A[p] <= A[q], into three parts.
+
+    Input:  A list, A, indices, left and right, indicating the boundaries of
+    the partition to be processed (right is one past the last index, and the
+    subarray has at least two elements), the distinct indices of the two
+    pivots, p and q, and optionally a stats object as in threeWayPartition.
+    Output: A tuple (lp, gp) of the final positions of the smaller and the
+    larger pivot, such that
+        A[left:lp]       <  P1
+        A[lp+1:gp]  between P1 and P2, inclusive
+        A[gp+1:right]    >  P2
+    where P1 = A[lp] <= P2 = A[gp].  If P1 == P2, every element of the middle
+    part equals the pivots and it is already sorted.
+
+    The pivots are swapped to the two ends of the subarray (and swapped with
+    each other if out of order).  As the pointer k scans towards the right, A
+    looks like this:
+
+        [P1 | <P1 | P1..P2 | unexamined | >P2 | P2]
+               l           k          g
+
+    An element less than P1 is swapped to the end of the <P1 part.  An element
+    greater than P2 is swapped with the right-most unexamined element that is
+    not itself greater than P2, and the element that comes back is checked
+    against P1.  The scan stops when k passes g, and the pivots are swapped
+    into place.  With random pivots, a full sort makes about 1.9nln(n)
+    comparisons instead of the 2nln(n) of single-pivot Quick Sort, and about
+    0.6nln(n) swaps, fewer than the single-pivot Lomuto-style scheme of
+    threeWayPartition.  Each recursion level also splits the work three ways,
+    so there are fewer passes over the data.
+    '''
+
+    if p == right - 1:               #move the pivots to the ends without one swap undoing the other
+        p, q = q, p
+    A[left], A[p] = A[p], A[left]
+    if q == left:
+        q = p
+    A[right-1], A[q] = A[q], A[right-1]
+
+    comparisons = 1
+    swaps = 2
+    if A[right-1] < A[left]:
+        A[left], A[right-1] = A[right-1], A[left]
+        swaps += 1
+    P1 = A[left]
+    P2 = A[right-1]
+
+    l = left + 1                     #left-most element of the P1..P2 part
+    g = right - 2                    #right-most unexamined element
+    k = l
+    while k <= g:
+        x = A[k]
+        comparisons += 1
+        if x < P1:
+            A[k] = A[l]
+            A[l] = x
+            l += 1
+            swaps += 1
+        else:
+            comparisons += 1
+            if P2 < x:
+                comparisons += 1
+                while k < g and P2 < A[g]:
+                    g -= 1
+                    comparisons += 1
+                A[k] = A[g]
+                A[g] = x
+                g -= 1
+                swaps += 1
+                x = A[k]
+                comparisons += 1
+                if x < P1:
+                    A[k] = A[l]
+                    A[l] = x
+                    l += 1
+                    swaps += 1
+        k += 1
+
+    l -= 1
+    g += 1
+    A[left], A[l] = A[l], A[left]    #swap the pivots into their final positions
+    A[right-1], A[g] = A[g], A[right-1]
+
+    if stats is not None:
+        stats.comparisons += comparisons
+        stats.swaps += swaps + 2
+
+    return (l, g)
@@ -1,11 +1,18 @@
 # Michael D. Salerno
 
-def rSelect(A, k):
+from partition import threeWayPartition
+from random_pivot import randomPivot
+from vectorized import VECTOR_CUTOFF, numericArray, vectorNarrow
+
+def rSelect(A, k, pivot = randomPivot, vectorCutoff = VECTOR_CUTOFF):
     '''
     My implementation of an O(n) randomized in-place selection algorithm.
     
-    Input:  A list of comparable elements, A, and the order of the element to
-    be selected, k.
+    Input:  A list of comparable elements (or a numeric array.array or NumPy
+    array), A, the order of the element to be selected, k, optionally the
+    pivot source, pivot (see random_pivot.py; pass RandomPivot(seed) for a
+    reproducible run), and the length above which numeric input is
+    partitioned with vectorized operations, vectorCutoff.
     Output:  The kth order statistic (the kth smallest element in A).
     
     The randomized selection algorithm uses the same partitioning procedure
@@ -15,10 +22,11 @@ def rSelect(A, k):
     Procedure Overview:
         0.  If the length of the array is 1, return its element
         1.  Choose a pivot from A uniformly at random
-        2.  Partition A around the pivot.  Let i = new index of the pivot
-        3.  If i == k, return the pivot
-        4.  If i > k, return a recursion on the left side of the array
-        5.  If i < k, return a recursion on the right side of the array
+        2.  Partition A around the pivot into <p, ==p and >p partitions (see
+            partition.py).  Let [lt, gt) = new indices of the ==p partition
+        3.  If lt <= k < gt, return the pivot
+        4.  If k < lt, return a recursion on the left side of the array
+        5.  If k >= gt, return a recursion on the right side of the array
     
     A key difference between this algorithm and Quick Sort is that there it uses 
     only one recursive call at each level.
@@ -81,10 +89,22 @@ def rSelect(A, k):
     
     QED!
     
+    Numeric fast path:
+    When NumPy is available and A is longer than vectorCutoff and holds only
+    ints or only floats (or is a numeric array.array or NumPy array), the 
+    partitioning steps are vectorized with boolean masks until at most 
+    vectorCutoff candidates are left, and the search then continues on those 
+    candidates as below (see vectorNarrow in vectorized.py).
+    
     '''
     
     assert 1 <= k <= len(A)  #Ensure that k makes sense for an array of length len(A)
     
+    a = numericArray(A) if len(A) > vectorCutoff else None
+    if a is not None:
+        A, k = vectorNarrow(a, k-1, pivot, vectorCutoff)    #A is now a short list of candidates and k is 0-based
+        k += 1
+    
     def randomizedSelection(A, left, right, k):
         '''
         Internal routine containing the implementation of the Randomized 
@@ -105,42 +125,21 @@ def rSelect(A, k):
         function's assertion to reflect the change in indexing.
         '''
         
-        import random
-        
         if left == right:
             return A[0]
             
-        p = random.choice(list(range(left, right)))    #randomized selection of pivot index
-        
-        A[left], A[p] = A[p], A[left]            #swap the pivot into the first position
+        p = pivot(A, left, right)              #randomized selection of pivot index
         
-        switchFlag = False                      ##flag to be used to handle duplicate pivot values
-        i = left                                #initialize pointer to shadow the division between the <p and >p partitions
-        for j in range(left+1, right):         #j is a pointer to the next unexamined element; it separates the <p and >p partitions from the unexamined partition
-            if A[j] == A[left]:                ##check if the next unexamined value is equal to the pivot; of this happens more than once, there are some number of duplicate pivot values
-                if not switchFlag:
-                    switchFlag = True          ##alternating switchFlag ensures that duplicate pivot values are split evenly
-                else:
-                    i += 1
-                    if i != j:
-                        A[i], A[j] = A[j], A[i]
-                    switchFlag = False
-                    
-            elif A[j] < A[left]:
-                i += 1                          #increment i so that it points at the left-most element of the >p partition
-                if i != j:                      #this check avoids redundant swaps which would occur if an element greater than the pivot hasn't been found yet
-                    A[i], A[j] = A[j], A[i]     #after this swap, i points at the right-most element of the <p partition that was just swapped in
-   
-        A[left], A[i] = A[i], A[left]           #swap the pivot with the right-most element of the <p partition; this will also be its correct position in the final sorted list
+        lt, gt = threeWayPartition(A, left, right, p)    #A[lt:gt] holds the pivot and its duplicates, already in their final positions
 
-        if i == k:                             #check if the pivot is the kth order statistic
-            return A[i]
+        if lt <= k < gt:                       #check if the pivot (or one of its duplicates) is the kth order statistic
+            return A[lt]
                                               
-        elif i > k:                           #if the pivot is greater than the kth order element, recurse on the left side of the array itself 
-            return randomizedSelection(A, left, i, k)
-        else:                                 #if the pivot is smaller than the kth order element, recurse on the right side of the array itself; not using k - i as 4th parameter because selection is happening in-place, thus, indeces are preserved
-            return randomizedSelection(A, i+1, right, k)
+        elif k < lt:                           #if the pivot is greater than the kth order element, recurse on the left side of the array itself 
+            return randomizedSelection(A, left, lt, k)
+        else:                                 #if the pivot is smaller than the kth order element, recurse on the right side of the array itself; not using k - gt as 4th parameter because selection is happening in-place, thus, indeces are preserved
+            return randomizedSelection(A, gt, right, k)
             
             
-    return randomizedSelection(A[:], 0, len(A), k-1)   #k-1 is passed here in order to offset to 1-based indexing from Python's native 0-based indexing
+    return randomizedSelection(list(A), 0, len(A), k-1) #k-1 is passed here in order to offset to 1-based indexing from Python's native 0-based indexing
                                                        #a copy of A is passed in order to prevent the original list from being modified 
\ No newline at end of file
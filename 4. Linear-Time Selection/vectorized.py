@@ -0,0 +1,168 @@
+# Michael D. Salerno
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:           #NumPy is optional; without it every sorter simply uses its pure Python path
+    np = None
+
+VECTOR_CUTOFF = 1024          #subarrays at or below this length are not worth a round of NumPy calls
+
+def numericArray(A):
+    '''
+    Returns a one-dimensional NumPy array holding the elements of A if A is a
+    homogeneous numeric buffer, or None if it is not (or NumPy is missing).
+
+    Input:  A list, an array.array, or a NumPy array.
+    Output: For a NumPy array, A itself; for an array.array, an array that
+    shares A's memory, so writing to it writes to A; for a list made up
+    entirely of ints (that fit in 64 bits) or entirely of floats, a new array.
+    None for anything else, including arrays containing NaN, which cannot be
+    ordered.
+    '''
+
+    if np is None:
+        return None
+
+    if isinstance(A, np.ndarray):
+        a = A if A.ndim == 1 and A.dtype.kind in 'iuf' else None
+    elif isinstance(A, array):
+        a = np.frombuffer(A, dtype = A.typecode) if A.typecode not in 'uw' else None
+    elif isinstance(A, list) and A:
+        if all(type(x) is int for x in A):
+            a = np.array(A, dtype = np.int64) if -2**63 <= min(A) and max(A) < 2**63 else None
+        elif all(type(x) is float for x in A):
+            a = np.array(A, dtype = np.float64)
+        else:
+            a = None
+    else:
+        a = None
+
+    if a is not None and a.dtype.kind == 'f' and np.isnan(a).any():
+        return None
+
+    return a
+
+def vectorPartition(a, left, right, p):
+    '''
+    Vectorized counterpart of threeWayPartition (see partition.py) for NumPy
+    arrays.
+
+    Input:  A NumPy array, a, the boundaries of the subarray to partition,
+    left and right, and the index of the pivot, p.
+    Output: A tuple (lt, gt) such that a[left:lt] < pivot, a[lt:gt] == pivot
+    and a[gt:right] > pivot.
+
+    Boolean masks select the three groups in a handful of passes over the
+    subarray, each running in compiled code, and the groups are written back
+    over the subarray in order.  The elements within each group keep their
+    relative order.
+    '''
+
+    seg = a[left:right]
+    x = seg[p - left]
+    less = seg[seg < x]
+    greater = seg[seg > x]
+
+    lt = left + len(less)
+    gt = right - len(greater)
+    seg[:lt-left] = less
+    seg[lt-left:gt-left] = x
+    seg[gt-left:] = greater
+
+    return (lt, gt)
+
+def vectorQuickSort(a, pivot, cutoff = VECTOR_CUTOFF):
+    '''
+    Quick Sort of a NumPy array in place, partitioning with vectorPartition.
+
+    Input:  A NumPy array, a, a pivot source, pivot (see random_pivot.py),
+    and the subarray length at or below which partitioning stops, cutoff.
+    Output: No output (a is sorted in place).
+
+    Subarrays of length <= cutoff are finished by NumPy's own sort, just as
+    quickSort finishes short subarrays with insertion sort.  The smaller
+    partition is sorted first and the larger one is pushed onto an explicit
+    stack, so no recursion is needed.
+    '''
+
+    stack = [(0, len(a))]
+    while stack:
+        left, right = stack.pop()
+        if right - left <= cutoff:
+            a[left:right].sort()
+            continue
+        lt, gt = vectorPartition(a, left, right, pivot(a, left, right))
+        if lt - left < right - gt:
+            stack.append((gt, right))
+            stack.append((left, lt))
+        else:
+            stack.append((left, lt))
+            stack.append((gt, right))
+
+def vectorMergeSort(a, cutoff = VECTOR_CUTOFF):
+    '''
+    Bottom-up Merge Sort of a NumPy array with vectorized merges.
+
+    Input:  A NumPy array, a, and the length of the initial runs, cutoff.
+    Output: A new NumPy array with the elements in sorted order (a is not
+    modified).
+
+    Runs of cutoff elements are sorted with NumPy's stable sort, then adjacent
+    runs are merged level by level.  A merge is computed in one shot: the
+    element L[i] of the left run lands at position i + (number of elements of
+    the right run < L[i]) and R[j] at j + (number of elements of the left run
+    <= R[j]), both counts coming from a binary search (searchsorted) over the
+    other run.  Equal elements of the left run therefore precede those of the
+    right run and the sort is stable.  Like mergeSort, the result and a single
+    buffer of the same size alternate as source and destination.
+    '''
+
+    src = np.array(a)
+    n = len(src)
+    for lo in range(0, n, cutoff):
+        src[lo:lo+cutoff].sort(kind = 'stable')
+
+    dst = np.empty_like(src)
+    width = cutoff
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            L = src[lo:mid]
+            R = src[mid:hi]
+            out = dst[lo:hi]
+            out[np.arange(len(L)) + np.searchsorted(R, L, 'left')] = L
+            out[np.arange(len(R)) + np.searchsorted(L, R, 'right')] = R
+        src, dst = dst, src
+        width *= 2
+
+    return src
+
+def vectorNarrow(a, k, pivot, cutoff = VECTOR_CUTOFF):
+    '''
+    Runs Randomized Selection on a NumPy array, with vectorized partitioning,
+    until the part of the array still known to contain the kth order statistic
+    is short enough to be handed back to the pure Python selection routine.
+
+    Input:  A NumPy array, a, the 0-based order, k, of the element sought, a
+    pivot source, pivot, and the length at which to stop, cutoff.
+    Output: A tuple (candidates, k) of a list containing the element sought
+    and its 0-based order within that list.  a is not modified.
+    '''
+
+    seg = a
+    while len(seg) > cutoff:
+        x = seg[pivot(seg, 0, len(seg))]
+        less = seg[seg < x]
+        if k < len(less):
+            seg = less
+            continue
+        equal = len(less) + int(np.count_nonzero(seg == x))
+        if k < equal:
+            return ([x.item()], 0)
+        seg = seg[seg > x]
+        k -= equal
+
+    return (seg.tolist(), k)
@@ -0,0 +1,420 @@
+# Michael D. Salerno
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from operator import itemgetter
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+for directory in ('4. Linear-Time Selection', '2. Quick Sort', '1. Divide and Conquer'):
+    sys.path.insert(0, os.path.join(ROOT, directory))      #the directories share helper modules by keeping identical copies
+
+from countInversions import countInversions
+from mergeSort import mergeSort, bottomUpMergeSort
+from cop_out_quickSort import cop_out_quickSort
+from example_quickSort import example_quickSort
+from pivot_strategies import quickSortEngine, dualPivotEngine, FirstElement, LastElement, MedianOfThree, Ninther
+from quickSort import quickSort
+from random_pivot import RandomPivot
+from vectorized import np
+from dSelect import dSelect
+from rSelect import rSelect
+
+SEED = 0                         #seed of every pivot source, so that comparison counts are reproducible
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+
+def randomData(n, rng):
+    return [rng.randint(0, n) for i in range(n)]
+
+def sortedData(n, rng):
+    return sorted(randomData(n, rng))
+
+def reversedData(n, rng):
+    return sorted(randomData(n, rng), reverse = True)
+
+def fewUniqueData(n, rng):
+    return [rng.randint(0, 9) for i in range(n)]
+
+def organPipeData(n, rng):
+    return [min(i, n - 1 - i) for i in range(n)]      #0, 1, ..., n/2, ..., 1, 0
+
+def sawtoothData(n, rng):
+    period = max(2, int(math.sqrt(n)))
+    return [i % period for i in range(n)]              #sqrt(n) ascending runs
+
+DISTRIBUTIONS = [('random', randomData),
+                 ('sorted', sortedData),
+                 ('reversed', reversedData),
+                 ('few unique', fewUniqueData),
+                 ('organ pipe', organPipeData),
+                 ('sawtooth', sawtoothData)]
+
+# Each benchmark is (name, function taking the input list, whether its comparisons can be counted)
+BENCHMARKS = [
+    ('mergeSort', mergeSort, True),
+    ('bottomUpMergeSort', bottomUpMergeSort, True),
+    ('quickSort', lambda A: quickSort(A, pivot = RandomPivot(SEED)), True),
+    ('quickSort (comparison only)', lambda A: quickSort(A, pivot = RandomPivot(SEED), vectorCutoff = len(A)), True),
+    ('quickSort (dual pivot)', lambda A: quickSort(A, pivot = RandomPivot(SEED), dualPivot = True), True),
+    ('quickSort (2 workers)', lambda A: quickSort(A, pivot = RandomPivot(SEED), workers = 2), False),
+    ('cop_out_quickSort', lambda A: cop_out_quickSort(A, RandomPivot(SEED)), True),
+    ('example_quickSort', lambda A: example_quickSort(A, RandomPivot(SEED)), True),
+    ('engine: first element', lambda A: quickSortEngine(A, FirstElement()), True),
+    ('engine: last element', lambda A: quickSortEngine(A, LastElement()), True),
+    ('engine: median of three', lambda A: quickSortEngine(A, MedianOfThree()), True),
+    ('engine: ninther', lambda A: quickSortEngine(A, Ninther()), True),
+    ('engine: dual pivot', lambda A: dualPivotEngine(A, RandomPivot(SEED)), True),
+    ('countInversions', countInversions, True),
+    ('rSelect', lambda A: rSelect(A, (len(A) + 1) // 2, RandomPivot(SEED)), True),
+    ('dSelect', lambda A: dSelect(A, (len(A) + 1) // 2), True),
+]
+
+
+class Counted(object):
+    '''
+    Wraps an element so that every comparison made on it is counted in
+    Counted.comparisons.  Wrapped elements are neither ints nor floats, so the
+    integer and NumPy fast paths never apply to them and the count is that of
+    the comparison-based algorithm.
+    '''
+    __slots__ = ('value',)
+    comparisons = 0
+    def __init__(self, value):
+        self.value = value
+    def __lt__(self, other):
+        Counted.comparisons += 1
+        return self.value < other.value
+    def __le__(self, other):
+        Counted.comparisons += 1
+        return self.value <= other.value
+    def __gt__(self, other):
+        Counted.comparisons += 1
+        return self.value > other.value
+    def __ge__(self, other):
+        Counted.comparisons += 1
+        return self.value >= other.value
+    def __eq__(self, other):
+        Counted.comparisons += 1
+        return self.value == other.value
+    def __ne__(self, other):
+        Counted.comparisons += 1
+        return self.value != other.value
+    __hash__ = None
+
+
+class ByKey(object):
+    '''
+    Wraps a record so that it compares by key(record); the way records had
+    to be sorted before the sorters accepted a key.  The key is recomputed on
+    both sides of every comparison.  Kept here as the baseline of benchmarkKeys.
+    '''
+    __slots__ = ('record', 'key')
+    def __init__(self, record, key):
+        self.record = record
+        self.key = key
+    def __lt__(self, other):
+        return self.key(self.record) < other.key(other.record)
+    def __le__(self, other):
+        return self.key(self.record) <= other.key(other.record)
+    def __gt__(self, other):
+        return self.key(self.record) > other.key(other.record)
+    def __ge__(self, other):
+        return self.key(self.record) >= other.key(other.record)
+    def __eq__(self, other):
+        return self.key(self.record) == other.key(other.record)
+
+def randomRecords(n, rng):
+    '''
+    Returns n random (name, age, score) tuples; many records share an age.
+    '''
+
+    return [('user%d' % rng.randrange(n), rng.randint(18, 90), rng.random()) for i in range(n)]
+
+def inPlace(sort):
+    '''
+    Adapts an in-place sorter to return the sorted list.
+    '''
+
+    def sorter(A, **options):
+        sort(A, **options)
+        return A
+    return sorter
+
+# Each key sorter is (name, function taking a list and key/reverse options and returning the sorted list)
+KEY_SORTERS = [
+    ('mergeSort', mergeSort),
+    ('bottomUpMergeSort', bottomUpMergeSort),
+    ('quickSort', inPlace(quickSort)),
+    ('quickSort (dual pivot)', inPlace(lambda A, **options: quickSort(A, dualPivot = True, **options))),
+    ('cop_out_quickSort', cop_out_quickSort),
+]
+
+KEY_ORDERINGS = [('score', itemgetter(2), False),
+                 ('age', itemgetter(1), False),
+                 ('age, reversed', itemgetter(1), True)]
+
+def measure(f, data, repeat = 3, countComparisons = True, trackMemory = True, budget = 60.0):
+    '''
+    Runs f on fresh copies of data and measures it.
+
+    Input:  A benchmark function, f, its input, data, the number of timed
+    runs, repeat, whether to make the extra runs that count comparisons and
+    trace memory, countComparisons and trackMemory, and the time budget of a
+    single run, budget, in seconds.
+    Output: A dictionary with the best wall time in seconds, 'time', the
+    peak memory allocated during a run in bytes, 'peakMemory', and the number
+    of element comparisons, 'comparisons'; None for whatever was not
+    measured.
+
+    Each quantity has a run of its own, since tracing allocations and
+    wrapping elements both slow the algorithm down.  Peak memory is measured
+    with tracemalloc, which sees NumPy's buffers as well as Python objects.
+    Those runs take several times as long as the timed ones, so they are left
+    out when a timed run took more than a twentieth of the budget.
+    '''
+
+    best = float('inf')
+    for r in range(repeat):
+        arr = list(data)
+        start = timeit.default_timer()
+        f(arr)
+        best = min(best, timeit.default_timer() - start)
+        if best > 1:                     #a second run of a slow case adds little accuracy
+            break
+
+    if best * 20 > budget:
+        countComparisons = trackMemory = False
+
+    peak = None
+    if trackMemory:
+        arr = list(data)
+        tracemalloc.start()
+        f(arr)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    comparisons = None
+    if countComparisons:
+        arr = [Counted(x) for x in data]
+        Counted.comparisons = 0
+        f(arr)
+        comparisons = Counted.comparisons
+
+    return {'time': best, 'peakMemory': peak, 'comparisons': comparisons}
+
+def runSuite(sizes = SIZES, benchmarks = None, distributions = None, repeat = 3, budget = 60.0,
+             comparisonLimit = 10**5, memoryLimit = 10**6, log = sys.stdout):
+    '''
+    Runs every benchmark on every distribution and size.
+
+    Input:  The input sizes, sizes, the names of the benchmarks and
+    distributions to run (None runs them all), the number of timed runs per
+    case, repeat, the longest a single run may be expected to take, budget,
+    in seconds, the largest size at which comparisons are counted,
+    comparisonLimit, and at which memory is traced, memoryLimit, and a file
+    to print progress to, log (None for silence).
+    Output: A list of result dictionaries with the keys 'benchmark',
+    'distribution' and 'n', plus those returned by measure, or 'skipped' or
+    'error' with the reason the case was not measured.
+
+    The time of each case is extrapolated from the two previous sizes of the
+    same benchmark and distribution, as t*(n/m)^e with the exponent e
+    estimated from their ratio (between 1 and 2).  Cases expected to exceed
+    the budget are skipped, which keeps the quadratic combinations, such as
+    first-element pivots on sorted input, from stalling the suite.  An
+    exception, such as a RecursionError, is recorded and the suite goes on.
+
+    Every dataset is generated from a random number generator seeded with the
+    name of its distribution and its size, so runs on different machines and
+    days see the same inputs.
+    '''
+
+    chosen = [b for b in BENCHMARKS if benchmarks is None or b[0] in benchmarks]
+    results = []
+    history = {}                         #(benchmark, distribution) -> [(n, time), ...]
+    if log:
+        log.write('%-30s %-12s %9s %11s %12s %14s\n' % ('benchmark', 'input', 'n', 'time', 'peak memory', 'comparisons'))
+
+    for distribution, generate in DISTRIBUTIONS:
+        if distributions is not None and distribution not in distributions:
+            continue
+        for n in sorted(set(sizes)):
+            data = generate(n, random.Random('%s %d' % (distribution, n)))
+            for name, f, countable in chosen:
+                record = {'benchmark': name, 'distribution': distribution, 'n': n}
+                past = history.get((name, distribution), [])
+                if past is None:
+                    record['skipped'] = 'failed at a smaller size'
+                elif past:
+                    m, t = past[-1]
+                    e = 1.1
+                    if len(past) > 1:
+                        (m0, t0) = past[-2]
+                        e = min(2.0, max(1.0, math.log(t / t0) / math.log(m / m0))) if t > 0 and t0 > 0 else 1.0
+                    if t * (n / float(m)) ** e > budget:
+                        record['skipped'] = 'expected to take over %gs' % budget
+                if 'skipped' not in record:
+                    try:
+                        record.update(measure(f, data, repeat, countable and n <= comparisonLimit, n <= memoryLimit, budget))
+                        history.setdefault((name, distribution), []).append((n, record['time']))
+                    except Exception as error:
+                        record['error'] = '%s: %s' % (type(error).__name__, error)
+                        history[(name, distribution)] = None     #skip the larger sizes
+                results.append(record)
+                if log:
+                    log.write(formatRecord(record) + '\n')
+                    log.flush()
+
+    return results
+
+def benchmarkKeys(n = 10**5, repeat = 3, seed = 0, log = sys.stdout):
+    '''
+    Compares sorting (name, age, score) records through the ByKey wrapper
+    with passing key (and reverse) directly, for every sorter in KEY_SORTERS,
+    sorting by score, by age, and by age in descending order.
+
+    Input:  The number of records, n, the number of timed runs per case,
+    repeat, the seed of the records, seed, and a file to print the table to,
+    log (None for silence).
+    Output: A list of dictionaries, one per case, with the sorter, the
+    ordering, and the best wall times through the wrapper and with the key.
+    '''
+
+    data = randomRecords(n, random.Random(seed))
+
+    results = []
+    if log:
+        log.write('%-24s %-15s %12s %12s %9s\n' % ('sorter', 'ordering', 'wrapper', 'key', 'speedup'))
+    for name, sort in KEY_SORTERS:
+        for ordering, key, reverse in KEY_ORDERINGS:
+            def wrapped(arr):
+                W = sort([ByKey(r, key) for r in arr])
+                if reverse:
+                    W.reverse()
+                return [w.record for w in W]
+            wrapper = measure(wrapped, data, repeat, False, False)['time']
+            direct = measure(lambda arr: sort(arr, key = key, reverse = reverse), data, repeat, False, False)['time']
+            results.append({'sorter': name, 'ordering': ordering, 'wrapperTime': wrapper, 'keyTime': direct})
+            if log:
+                log.write('%-24s %-15s %11.4fs %11.4fs %8.2fx\n' % (name, ordering, wrapper, direct, wrapper / direct))
+
+    return results
+
+def formatRecord(record):
+    '''
+    Formats a result dictionary as a row of the progress table.
+    '''
+
+    head = '%-30s %-12s %9d' % (record['benchmark'], record['distribution'], record['n'])
+    if 'skipped' in record:
+        return head + '  skipped: ' + record['skipped']
+    if 'error' in record:
+        return head + '  error: ' + record['error']
+
+    memory = '%dKB' % (record['peakMemory'] // 1024) if record['peakMemory'] is not None else '-'
+    comparisons = '%d' % record['comparisons'] if record['comparisons'] is not None else '-'
+    return head + ' %10.4fs %12s %14s' % (record['time'], memory, comparisons)
+
+def findRegressions(results, baseline, threshold = 0.25, minTime = 0.005):
+    '''
+    Compares results with those of an earlier run.
+
+    Input:  Two lists of result dictionaries, results and baseline, as
+    returned by runSuite, the fraction by which a measurement may grow before
+    it counts as a regression, threshold, and the time below which timings
+    are considered noise, minTime, in seconds.
+    Output: A list of strings describing each regression; empty if there are
+    none.
+
+    Cases are matched by benchmark, distribution and size; cases missing from
+    either run are ignored.  A case that was measured in the baseline but now
+    fails with an error counts as a regression.
+    '''
+
+    earlier = dict(((r['benchmark'], r['distribution'], r['n']), r) for r in baseline)
+    regressions = []
+    for r in results:
+        old = earlier.get((r['benchmark'], r['distribution'], r['n']))
+        if old is None or 'time' not in old:
+            continue
+        case = '%s on %s n=%d' % (r['benchmark'], r['distribution'], r['n'])
+        if 'error' in r:
+            regressions.append('%s: %s' % (case, r['error']))
+            continue
+        if 'time' not in r:
+            continue
+
+        if r['time'] > max(old['time'], minTime) * (1 + threshold):
+            regressions.append('%s: time %.4fs -> %.4fs' % (case, old['time'], r['time']))
+        for quantity in ('peakMemory', 'comparisons'):
+            if r[quantity] is not None and old[quantity] is not None and r[quantity] > old[quantity] * (1 + threshold):
+                regressions.append('%s: %s %d -> %d' % (case, quantity, old[quantity], r[quantity]))
+
+    return regressions
+
+def main(argv = None):
+    '''
+    Command line entry point; run with --help for the options.  The results
+    are written to a JSON file along with the versions of Python and NumPy
+    and the platform they were measured on; --output names the file, which
+    otherwise goes to the system's temporary directory, so that running the
+    suite leaves the working tree clean.  With --baseline, the results are
+    compared with those in an earlier JSON file, and the exit status is 1 if
+    anything regressed by more than --threshold.
+
+    Examples:
+        python benchmarkSuite.py --sizes 1000 10000 100000 --output base.json
+        python benchmarkSuite.py --sizes 1000 10000 100000 --baseline base.json
+        python benchmarkSuite.py --keys 100000
+    '''
+
+    parser = argparse.ArgumentParser(description = 'Benchmarks the sorting, inversion counting and selection algorithms.')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = list(SIZES))
+    parser.add_argument('--benchmarks', nargs = '+', choices = [b[0] for b in BENCHMARKS], metavar = 'NAME')
+    parser.add_argument('--distributions', nargs = '+', choices = [d[0] for d in DISTRIBUTIONS], metavar = 'NAME')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'timed runs per case; the best is kept')
+    parser.add_argument('--budget', type = float, default = 60.0, help = 'skip cases expected to run longer (seconds)')
+    parser.add_argument('--comparison-limit', type = int, default = 10**5, help = 'largest n at which comparisons are counted')
+    parser.add_argument('--memory-limit', type = int, default = 10**6, help = 'largest n at which memory is traced')
+    parser.add_argument('--output', default = os.path.join(tempfile.gettempdir(), 'benchmarkResults.json'),
+                        help = 'JSON file to write the results to (default: %(default)s)')
+    parser.add_argument('--baseline', help = 'JSON file of an earlier run to check for regressions')
+    parser.add_argument('--threshold', type = float, default = 0.25, help = 'allowed relative growth (0.25 = 25%%)')
+    parser.add_argument('--keys', type = int, nargs = '?', const = 10**5, metavar = 'N',
+                        help = 'instead of the suite, compare key= with a comparison wrapper on N records')
+    args = parser.parse_args(argv)
+
+    if args.keys:
+        benchmarkKeys(args.keys, args.repeat)
+        return 0
+
+    results = runSuite(args.sizes, args.benchmarks, args.distributions, args.repeat, args.budget,
+                       args.comparison_limit, args.memory_limit)
+
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(),
+                   'numpy': np.__version__ if np is not None else None,
+                   'platform': platform.platform(),
+                   'results': results}, f, indent = 1)
+    print('Results written to ' + args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = findRegressions(results, json.load(f)['results'], args.threshold)
+        for r in regressions:
+            print('REGRESSION ' + r)
+        if regressions:
+            return 1
+        print('No regressions beyond %g%%.' % (100 * args.threshold))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())